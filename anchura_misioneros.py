@@ -1,4 +1,6 @@
-import math
+import heapq
+import sys
+from collections import deque
 
 class State():
     def __init__(self, cannibalLeft, missionaryLeft, boat, cannibalRight, missionaryRight):
@@ -32,90 +34,283 @@ class State():
     def __hash__(self):
         return hash((self.cannibalLeft, self.missionaryLeft, self.boat, self.cannibalRight, self.missionaryRight))
 
-def successors(cur_state):
+def boat_loads(capacity=2):
+    ## Every (missionaries, cannibals) load the boat can carry, largest loads first.
+    ## For each size: only missionaries, only cannibals, then the mixed loads
+    ## (for capacity 2 this is the order of the original hand-written moves).
+    loads = []
+    for size in range(capacity, 0, -1):
+        loads.append((size, 0))
+        loads.append((0, size))
+        for missionaries in range(size - 1, 0, -1):
+            loads.append((missionaries, size - missionaries))
+    return loads
+
+def successors(cur_state, capacity=2):
     children = []
-    if cur_state.boat == 'left':
-        new_state = State(cur_state.cannibalLeft, cur_state.missionaryLeft - 2, 'right',
-                          cur_state.cannibalRight, cur_state.missionaryRight + 2)
-        ## Two missionaries cross left to right.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft - 2, cur_state.missionaryLeft, 'right',
-                          cur_state.cannibalRight + 2, cur_state.missionaryRight)
-        ## Two cannibals cross left to right.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft - 1, cur_state.missionaryLeft - 1, 'right',
-                          cur_state.cannibalRight + 1, cur_state.missionaryRight + 1)
-        ## One missionary and one cannibal cross left to right.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft, cur_state.missionaryLeft - 1, 'right',
-                          cur_state.cannibalRight, cur_state.missionaryRight + 1)
-        ## One missionary crosses left to right.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft - 1, cur_state.missionaryLeft, 'right',
-                          cur_state.cannibalRight + 1, cur_state.missionaryRight)
-        ## One cannibal crosses left to right.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-    else:
-        new_state = State(cur_state.cannibalLeft, cur_state.missionaryLeft + 2, 'left',
-                          cur_state.cannibalRight, cur_state.missionaryRight - 2)
-        ## Two missionaries cross right to left.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft + 2, cur_state.missionaryLeft, 'left',
-                          cur_state.cannibalRight - 2, cur_state.missionaryRight)
-        ## Two cannibals cross right to left.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft + 1, cur_state.missionaryLeft + 1, 'left',
-                          cur_state.cannibalRight - 1, cur_state.missionaryRight - 1)
-        ## One missionary and one cannibal cross right to left.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft, cur_state.missionaryLeft + 1, 'left',
-                          cur_state.cannibalRight, cur_state.missionaryRight - 1)
-        ## One missionary crosses right to left.
-        if new_state.is_valid():
-            new_state.parent = cur_state
-            children.append(new_state)
-        new_state = State(cur_state.cannibalLeft + 1, cur_state.missionaryLeft, 'left',
-                          cur_state.cannibalRight - 1, cur_state.missionaryRight)
-        ## One cannibal crosses right to left.
+    ## The boat carries people from the bank it is on to the other one.
+    direction = -1 if cur_state.boat == 'left' else 1
+    new_boat = 'right' if cur_state.boat == 'left' else 'left'
+    for missionaries, cannibals in boat_loads(capacity):
+        new_state = State(cur_state.cannibalLeft + direction * cannibals,
+                          cur_state.missionaryLeft + direction * missionaries, new_boat,
+                          cur_state.cannibalRight - direction * cannibals,
+                          cur_state.missionaryRight - direction * missionaries)
         if new_state.is_valid():
             new_state.parent = cur_state
             children.append(new_state)
     return children
 
-def breadth_first_search():
-    initial_state = State(3, 3, 'left', 0, 0) #Estado Inicial
+def neighbors(state, missionaries, cannibals, loads):
+    ## Valid (cannibalLeft, missionaryLeft, boatLeft) states one crossing away, in `loads` order.
+    ## Crossings are reversible, so the same function serves a search that runs from the goal.
+    cannibalLeft, missionaryLeft, boatLeft = state
+    direction = -1 if boatLeft else 1
+    children = []
+    for movedMissionaries, movedCannibals in loads:
+        newMissionaryLeft = missionaryLeft + direction * movedMissionaries
+        newCannibalLeft = cannibalLeft + direction * movedCannibals
+        newMissionaryRight = missionaries - newMissionaryLeft
+        newCannibalRight = cannibals - newCannibalLeft
+        ## Same rule as State.is_valid
+        if newMissionaryLeft >= 0 and newMissionaryRight >= 0 \
+           and newCannibalLeft >= 0 and newCannibalRight >= 0 \
+           and (newMissionaryLeft == 0 or newMissionaryLeft >= newCannibalLeft) \
+           and (newMissionaryRight == 0 or newMissionaryRight >= newCannibalRight):
+            children.append((newCannibalLeft, newMissionaryLeft, not boatLeft))
+    return children
+
+def build_path(parents, goal, missionaries, cannibals):
+    ## Turns the (cannibalLeft, missionaryLeft, boatLeft) chain stored in `parents`
+    ## into linked State objects, so print_solution works unchanged.
+    chain = []
+    key = goal
+    while key is not None:
+        chain.append(key)
+        key = parents[key]
+    state = None
+    for cannibalLeft, missionaryLeft, boatLeft in reversed(chain):
+        child = State(cannibalLeft, missionaryLeft, 'left' if boatLeft else 'right',
+                      cannibals - cannibalLeft, missionaries - missionaryLeft)
+        child.parent = state
+        state = child
+    return state
+
+def breadth_first_search(missionaries=3, cannibals=3, capacity=2, stats=None):
+    initial_state = State(cannibals, missionaries, 'left', 0, 0) #Estado Inicial
+    if not initial_state.is_valid():
+        return None
     if initial_state.is_goal():
         return initial_state
-    frontier = []
-    explored = set()
-    frontier.append(initial_state)
+    ## The search works on (cannibalLeft, missionaryLeft, boatLeft) tuples and only builds
+    ## State objects for the solution path. deque gives O(1) pops from the front and
+    ## `parents` doubles as the O(1) index of every state ever queued (frontier and explored).
+    loads = boat_loads(capacity)
+    start = (cannibals, missionaries, True)
+    parents = {start: None}
+    frontier = deque([start])
+    expanded = 0
     while frontier:
-        state = frontier.pop(0)
-        if state.is_goal():
-            return state
-        explored.add(state)
-        children = successors(state)
-        for child in children:
-            if child not in explored and child not in frontier:
+        state = frontier.popleft()
+        if state[0] == 0 and state[1] == 0:
+            if stats is not None:
+                stats.update(expanded=expanded, generated=len(parents))
+            return build_path(parents, state, missionaries, cannibals)
+        expanded += 1
+        for child in neighbors(state, missionaries, cannibals, loads):
+            if child not in parents:
+                parents[child] = state
                 frontier.append(child)
+    if stats is not None:
+        stats.update(expanded=expanded, generated=len(parents))
     return None
 
+def crossings_heuristic(state, capacity):
+    ## Lower bound on the crossings still needed. With the boat on the left, each round trip
+    ## moves at most capacity - 1 people to the right (someone rows back) and the last crossing
+    ## at most `capacity`. With the boat on the right someone must first row back, adding a person.
+    cannibalLeft, missionaryLeft, boatLeft = state
+    people = cannibalLeft + missionaryLeft
+    if people == 0:
+        return 0
+    extra = 0
+    if not boatLeft:
+        people += 1
+        extra = 1
+    if people <= capacity or capacity <= 1:
+        return extra + 1
+    return extra + 2 * -(-(people - capacity) // (capacity - 1)) + 1
+
+def a_star_search(missionaries=3, cannibals=3, capacity=2, stats=None):
+    initial_state = State(cannibals, missionaries, 'left', 0, 0)
+    if not initial_state.is_valid():
+        return None
+    if initial_state.is_goal():
+        return initial_state
+    loads = boat_loads(capacity)
+    start = (cannibals, missionaries, True)
+    parents = {start: None}
+    cost = {start: 0}
+    ## Entries are (f, -g, order, state): among equal f the deepest state goes first, which
+    ## matters because the bound is often tight and whole layers share the same f
+    order = 0
+    frontier = [(crossings_heuristic(start, capacity), 0, order, start)]
+    expanded = 0
+    while frontier:
+        _, negativeCost, _, state = heapq.heappop(frontier)
+        stateCost = -negativeCost
+        if stateCost > cost[state]:
+            continue  ## stale entry: the state was queued again with a cheaper path
+        if state[0] == 0 and state[1] == 0:
+            if stats is not None:
+                stats.update(expanded=expanded, generated=len(parents))
+            return build_path(parents, state, missionaries, cannibals)
+        expanded += 1
+        childCost = stateCost + 1
+        for child in neighbors(state, missionaries, cannibals, loads):
+            if child not in cost or childCost < cost[child]:
+                cost[child] = childCost
+                parents[child] = state
+                order += 1
+                heapq.heappush(frontier, (childCost + crossings_heuristic(child, capacity), -childCost, order, child))
+    if stats is not None:
+        stats.update(expanded=expanded, generated=len(parents))
+    return None
+
+def bidirectional_search(missionaries=3, cannibals=3, capacity=2, stats=None):
+    initial_state = State(cannibals, missionaries, 'left', 0, 0)
+    if not initial_state.is_valid():
+        return None
+    if initial_state.is_goal():
+        return initial_state
+    loads = boat_loads(capacity)
+    start = (cannibals, missionaries, True)
+    goal = (0, 0, False)
+    ## parents[state] = (previous state on that side, distance from that side's root)
+    forward = {start: (None, 0)}
+    backward = {goal: (None, 0)}
+    forwardLayer, backwardLayer = [start], [goal]
+    expanded = 0
+    meeting = None
+    while forwardLayer and backwardLayer and meeting is None:
+        ## Expand one whole layer of the smaller side. Among the states of that layer already seen
+        ## by the other side, the one with the shortest total distance closes an optimal path.
+        if len(forwardLayer) <= len(backwardLayer):
+            layer, parents, other = forwardLayer, forward, backward
+        else:
+            layer, parents, other = backwardLayer, backward, forward
+        nextLayer = []
+        best = None
+        for state in layer:
+            expanded += 1
+            distance = parents[state][1] + 1
+            for child in neighbors(state, missionaries, cannibals, loads):
+                if child in parents:
+                    continue
+                parents[child] = (state, distance)
+                nextLayer.append(child)
+                if child in other and (best is None or distance + other[child][1] < best):
+                    best = distance + other[child][1]
+                    meeting = child
+        if parents is forward:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+    if stats is not None:
+        stats.update(expanded=expanded, generated=len(forward) + len(backward))
+    if meeting is None:
+        return None
+
+    ## Forward links from the start to the meeting state, then the backward side reversed
+    chain = {}
+    state = meeting
+    while state is not None:
+        chain[state] = forward[state][0]
+        state = forward[state][0]
+    state = meeting
+    while backward[state][0] is not None:
+        chain[backward[state][0]] = state
+        state = backward[state][0]
+    return build_path(chain, goal, missionaries, cannibals)
+
+def shortest_distances(missionaries=3, cannibals=3, capacity=2):
+    ## One BFS from the start that keeps only the distance of each state, up to the goal layer.
+    ## The distances describe the DAG of all shortest paths: the optimal predecessors of a state
+    ## at distance d are its neighbors at distance d - 1, so no predecessor lists are stored.
+    ## Returns (distances, loads, goal), with goal None when there is no solution.
+    loads = boat_loads(capacity)
+    start = (cannibals, missionaries, True)
+    distances = {start: 0}
+    if not State(cannibals, missionaries, 'left', 0, 0).is_valid():
+        return distances, loads, None
+    frontier = deque([start])
+    while frontier:
+        state = frontier.popleft()
+        if state[0] == 0 and state[1] == 0:
+            return distances, loads, state
+        distance = distances[state] + 1
+        for child in neighbors(state, missionaries, cannibals, loads):
+            if child not in distances:
+                distances[child] = distance
+                frontier.append(child)
+    return distances, loads, None
+
+def optimal_predecessors(state, distances, missionaries, cannibals, loads):
+    distance = distances[state] - 1
+    return [previous for previous in neighbors(state, missionaries, cannibals, loads)
+            if distances.get(previous) == distance]
+
+def all_optimal_solutions(missionaries=3, cannibals=3, capacity=2):
+    ## Generator over every shortest plan, each one a State chain for print_solution.
+    ## Plans are produced one at a time by a depth-first walk back from the goal over the
+    ## shortest-path DAG, so memory stays proportional to one plan even when there are millions.
+    distances, loads, goal = shortest_distances(missionaries, cannibals, capacity)
+    if goal is None:
+        return
+    if distances[goal] == 0:
+        yield build_path({goal: None}, goal, missionaries, cannibals)
+        return
+    ## path: states from the goal back to the current one; pending: untried predecessors per level
+    path = [goal]
+    pending = [optimal_predecessors(goal, distances, missionaries, cannibals, loads)]
+    while pending:
+        if not pending[-1]:
+            pending.pop()
+            path.pop()
+            continue
+        state = pending[-1].pop(0)
+        path.append(state)
+        if distances[state] == 0:
+            parents = {path[i]: path[i + 1] for i in range(len(path) - 1)}
+            parents[state] = None
+            yield build_path(parents, goal, missionaries, cannibals)
+            path.pop()
+        else:
+            pending.append(optimal_predecessors(state, distances, missionaries, cannibals, loads))
+
+def count_optimal_solutions(missionaries=3, cannibals=3, capacity=2):
+    ## Number of shortest plans by dynamic programming over the layered DAG: the ways to reach
+    ## a state are the sum of the ways to reach its optimal predecessors. `distances` is in BFS
+    ## order, so predecessors are always counted first.
+    distances, loads, goal = shortest_distances(missionaries, cannibals, capacity)
+    if goal is None:
+        return 0
+    ways = {}
+    for state, distance in distances.items():
+        if distance == 0:
+            ways[state] = 1
+        elif distance <= distances[goal]:
+            ways[state] = sum(ways[previous]
+                              for previous in optimal_predecessors(state, distances, missionaries, cannibals, loads))
+    return ways[goal]
+
+SEARCHES = {"bfs": breadth_first_search, "astar": a_star_search, "bidirectional": bidirectional_search}
+
+def solve(missionaries=3, cannibals=3, capacity=2, method="bfs", stats=None):
+    if method not in SEARCHES:
+        raise ValueError("Unknown search method: %s (choose from %s)" % (method, ", ".join(SEARCHES)))
+    return SEARCHES[method](missionaries, cannibals, capacity, stats)
+
 def print_solution(solution):
     path = []
     path.append(solution)
@@ -130,7 +325,16 @@ def print_solution(solution):
               + state.boat + "," + str(state.cannibalRight) + "," + str(state.missionaryRight) + ")")
 
 def main():
-    solution = breadth_first_search()
+    ## Optional arguments: missionaries cannibals boat_capacity [bfs|astar|bidirectional] (default 3 3 2 bfs)
+    missionaries, cannibals, capacity = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (3, 3, 2)
+    method = sys.argv[4] if len(sys.argv) > 4 else "bfs"
+    stats = {}
+    solution = solve(missionaries, cannibals, capacity, method, stats)
+    if len(sys.argv) > 4:
+        print("%s: %d nodes expanded, %d generated" % (method, stats["expanded"], stats["generated"]))
+    if solution is None:
+        print("No solution for %d missionaries, %d cannibals and a boat of %d" % (missionaries, cannibals, capacity))
+        return
     print("Misioneros y Caníbales Solución:")
     print("(canibalIzquierda, misioneroIzquierda, bote, canibalDerecha, misioneroDerecha)")
     print_solution(solution)
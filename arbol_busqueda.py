@@ -0,0 +1,187 @@
+import json
+import os
+import struct
+import sys
+
+# Captura del árbol que recorre la búsqueda, escrita en disco a medida que se explora
+# (sin networkx ni matplotlib). Formatos:
+#   dot    Graphviz, un digraph por búsqueda: `dot -Tsvg arbol.dot -o arbol.svg`
+#   jsonl  un objeto JSON por nodo
+#   bin    registros de tamaño fijo indexados por id; los ids se asignan en preorden, así que
+#          el subárbol de un nodo ocupa los registros [id, id + tamano) y se carga bajo demanda
+FORMATOS = ("dot", "jsonl", "bin")
+TIPOS = ("interior", "hoja", "tt", "corte", "podado", "interrumpido")
+MAGIA = b"ARB1"
+REGISTRO = struct.Struct("<IIiHHBB")  # padre, tamano, valor, profundidad, movimiento, tipo, jugador
+# En el binario el jugador se guarda como 0 (la IA) o 1 (el humano): las fichas son configurables
+JUGADORES = ("ia", "humano")
+SIN_JUGADOR = 2
+SIN_PADRE = 0xFFFFFFFF
+SIN_VALOR = -(2 ** 31)
+SIN_MOVIMIENTO = 0xFFFF
+
+
+class CapturaArbol:
+    def __init__(self, ruta, formato=None, profundidad_maxima=None, max_nodos=100000):
+        formato = formato or os.path.splitext(ruta)[1].lstrip(".")
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de árbol desconocido: {formato}")
+        self.ruta = ruta
+        self.formato = formato
+        self.profundidad_maxima = profundidad_maxima
+        self.max_nodos = max_nodos
+        self.archivo = open(ruta, "w+b" if formato == "bin" else "w", encoding=None if formato == "bin" else "utf-8")
+        if formato == "bin":
+            self.archivo.write(MAGIA)
+        self.siguiente_id = 0
+        self.busquedas = 0
+        self.nodos_busqueda = 0
+        self.omitidos = 0  # nodos no guardados por los límites de profundidad o de nodos
+        self.abiertos = []  # pila de ids de los nodos en curso (None si ese nodo no se guarda)
+        self.datos = {}  # id -> [padre, profundidad, movimiento, jugador, tipo] de los nodos abiertos
+        self.fichas = ("X", "O")  # (IA, humano) de la búsqueda en curso
+
+    def _nuevo(self, movimiento, jugador, tipo="interior"):
+        # Devuelve el id del nodo hijo del nodo abierto actual, o None si queda fuera de los límites
+        profundidad = len(self.abiertos)
+        padre = self.abiertos[-1] if self.abiertos else None
+        if (self.abiertos and padre is None) or self.nodos_busqueda >= self.max_nodos or \
+                (self.profundidad_maxima is not None and profundidad > self.profundidad_maxima):
+            self.omitidos += 1
+            return None
+        nodo = self.siguiente_id
+        self.siguiente_id += 1
+        self.nodos_busqueda += 1
+        self.datos[nodo] = [padre, profundidad, movimiento, jugador, tipo]
+        return nodo
+
+    def _escribir(self, nodo, valor):
+        padre, profundidad, movimiento, jugador, tipo = self.datos.pop(nodo)
+        tamano = self.siguiente_id - nodo
+        if self.formato == "jsonl":
+            self.archivo.write(json.dumps({"id": nodo, "padre": padre, "profundidad": profundidad,
+                                           "movimiento": movimiento, "jugador": jugador, "valor": valor,
+                                           "tipo": tipo, "tamano": tamano}) + "\n")
+        elif self.formato == "dot":
+            etiqueta = "raíz" if movimiento is None else f"{jugador}{movimiento}"
+            estilo = {"podado": ', style=dashed, color=gray', "corte": ', color=red', "tt": ', shape=box',
+                      "interrumpido": ', color=orange'}.get(tipo, "")
+            texto = "" if valor is None else f"\\n{valor}"
+            self.archivo.write(f'  n{nodo} [label="{etiqueta}{texto}"{estilo}];\n')
+            if padre is not None:
+                self.archivo.write(f"  n{padre} -> n{nodo};\n")
+        else:
+            self.archivo.seek(len(MAGIA) + nodo * REGISTRO.size)
+            self.archivo.write(REGISTRO.pack(SIN_PADRE if padre is None else padre, tamano,
+                                             SIN_VALOR if valor is None else valor, profundidad,
+                                             SIN_MOVIMIENTO if movimiento is None else movimiento,
+                                             TIPOS.index(tipo),
+                                             SIN_JUGADOR if jugador is None else self.fichas.index(jugador)))
+
+    def iniciar(self, tablero, jugador, limite=None, rival=None):
+        # Raíz de una búsqueda (un turno o una iteración de la profundización): la posición en la que
+        # mueve `jugador` (la IA) frente a `rival` (el humano)
+        self.busquedas += 1
+        if rival is not None:
+            self.fichas = (jugador, rival)
+        self.nodos_busqueda = 0
+        if self.formato == "dot":
+            posicion = "".join(c if c != " " else "." for c in tablero)
+            texto_limite = "" if limite is None else f", límite {limite}"
+            self.archivo.write(f'digraph busqueda_{self.busquedas} {{\n  label="Búsqueda {self.busquedas}: '
+                               f'[{posicion}] mueve {jugador}{texto_limite}";\n')
+        self.abiertos = [self._nuevo(None, None)]
+
+    def entrar(self, movimiento, jugador):
+        self.abiertos.append(self._nuevo(movimiento, jugador))
+
+    def marcar(self, tipo):
+        nodo = self.abiertos[-1]
+        if nodo is not None:
+            self.datos[nodo][4] = tipo
+
+    def salir(self, valor):
+        nodo = self.abiertos.pop()
+        if nodo is not None:
+            self._escribir(nodo, valor)
+
+    def podar(self, movimientos, jugador):
+        # Jugadas que la poda dejó sin buscar: hojas sin valor colgando del nodo actual
+        for movimiento in movimientos:
+            nodo = self._nuevo(movimiento, jugador, "podado")
+            if nodo is not None:
+                self._escribir(nodo, None)
+
+    def interrumpir(self):
+        # Se agotó el presupuesto: se cierran los nodos abiertos menos la raíz
+        while len(self.abiertos) > 1:
+            self.marcar("interrumpido")
+            self.salir(None)
+
+    def terminar(self, valor):
+        self.interrumpir()
+        if self.abiertos:
+            self.salir(valor)
+        if self.formato == "dot":
+            self.archivo.write("}\n")
+        self.archivo.flush()
+
+    def cerrar(self):
+        self.archivo.close()
+
+
+def leer_nodo(archivo, nodo, jugadores=JUGADORES):
+    archivo.seek(len(MAGIA) + nodo * REGISTRO.size)
+    padre, tamano, valor, profundidad, movimiento, tipo, jugador = REGISTRO.unpack(archivo.read(REGISTRO.size))
+    return {"id": nodo, "padre": None if padre == SIN_PADRE else padre, "tamano": tamano,
+            "valor": None if valor == SIN_VALOR else valor, "profundidad": profundidad,
+            "movimiento": None if movimiento == SIN_MOVIMIENTO else movimiento, "tipo": TIPOS[tipo],
+            "jugador": jugadores[jugador] if jugador != SIN_JUGADOR else None}
+
+
+def leer_raices(ruta, jugadores=JUGADORES):
+    # Raíces de las búsquedas guardadas: cada una empieza donde acaba el subárbol de la anterior
+    with open(ruta, "rb") as archivo:
+        if archivo.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un árbol de búsqueda en formato binario")
+        total = (os.path.getsize(ruta) - len(MAGIA)) // REGISTRO.size
+        raices = []
+        nodo = 0
+        while nodo < total:
+            raices.append(leer_nodo(archivo, nodo, jugadores))
+            nodo += raices[-1]["tamano"]
+        return raices
+
+
+def leer_subarbol(ruta, nodo=0, niveles=1, jugadores=JUGADORES):
+    # Carga de un archivo .bin solo el nodo y sus descendientes hasta `niveles` por debajo,
+    # saltando con `tamano` los subárboles más profundos sin leerlos
+    with open(ruta, "rb") as archivo:
+        if archivo.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f"{ruta} no es un árbol de búsqueda en formato binario")
+        raiz = leer_nodo(archivo, nodo, jugadores)
+        nodos = [raiz]
+        actual = nodo + 1
+        fin = nodo + raiz["tamano"]
+        while actual < fin:
+            registro = leer_nodo(archivo, actual, jugadores)
+            if registro["profundidad"] - raiz["profundidad"] < niveles:
+                actual += 1
+            else:
+                actual += registro["tamano"]
+            nodos.append(registro)
+        return nodos
+
+
+if __name__ == "__main__":
+    # python arbol_busqueda.py arbol.bin [nodo [niveles]]: sin nodo lista las raíces de cada búsqueda
+    ruta = sys.argv[1]
+    if len(sys.argv) > 2:
+        registros = leer_subarbol(ruta, int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 1)
+    else:
+        registros = leer_raices(ruta)
+    for registro in registros:
+        sangria = "  " * registro["profundidad"]
+        jugada = "raíz" if registro["movimiento"] is None else f"{registro['jugador']} {registro['movimiento']}"
+        print(f"{sangria}#{registro['id']} {jugada} valor={registro['valor']} {registro['tipo']} "
+              f"({registro['tamano']} nodos)")
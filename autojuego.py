@@ -0,0 +1,126 @@
+import argparse
+import random
+import time
+from collections import Counter
+
+from poda_AB import ESTRATEGIAS, TresEnRaya, TresEnRayaBits
+
+FICHAS = ("X", "O")
+
+
+class JugadorAleatorio:
+    def __init__(self, ficha, semilla=None):
+        self.ficha = ficha
+        self.azar = random.Random(semilla)
+
+    def nueva_partida(self):
+        pass
+
+    def elegir(self, tablero):
+        return self.azar.choice([i for i, casilla in enumerate(tablero) if casilla == " "])
+
+    def cerrar(self):
+        pass
+
+
+class JugadorMotor:
+    # Un motor silencioso por jugador: cada uno se ve a sí mismo como la IA
+    def __init__(self, ficha, bits=False, mcts=False, **opciones):
+        if mcts:
+            # Solo se importa si se usa, como el resto de motores alternativos
+            from mcts import TresEnRayaMCTS, TresEnRayaMCTSBits
+            clase = TresEnRayaMCTSBits if bits else TresEnRayaMCTS
+        else:
+            clase = TresEnRayaBits if bits else TresEnRaya
+        rival = FICHAS[1] if ficha == FICHAS[0] else FICHAS[0]
+        self.ficha = ficha
+        self.motor = clase(jugador_ia=ficha, jugador_humano=rival, silencioso=True, **opciones)
+
+    def nueva_partida(self):
+        self.motor.nueva_partida()
+
+    def elegir(self, tablero):
+        self.motor.tablero[:] = tablero
+        return self.motor.obtener_mejor_movimiento()
+
+    def cerrar(self):
+        self.motor.cerrar()
+
+
+def jugar_partida(jugadores, filas=3, columnas=3, k=3):
+    # jugadores: (quien mueve primero, el otro). Devuelve la ficha ganadora (o None si hay empate)
+    # y los segundos que tardó cada jugada, por ficha
+    arbitro = TresEnRaya(filas, columnas, k, capacidad_tt=0, usar_libro=False, silencioso=True)
+    latencias = {jugador.ficha: [] for jugador in jugadores}
+    for jugador in jugadores:
+        jugador.nueva_partida()
+    turno = 0
+    while not arbitro.juego_terminado():
+        jugador = jugadores[turno % 2]
+        inicio = time.perf_counter()
+        movimiento = jugador.elegir(list(arbitro.tablero))
+        latencias[jugador.ficha].append(time.perf_counter() - inicio)
+        if not arbitro.realizar_movimiento(movimiento, jugador.ficha):
+            raise RuntimeError(f"{jugador.ficha} eligió una casilla ocupada: {movimiento}")
+        turno += 1
+    return arbitro.verificar_ganador(), latencias
+
+
+def autojuego(partidas, rival="motor", estrategia="alfabeta", bits=False, semilla=0,
+              filas=3, columnas=3, k=3, tiempo=None, usar_libro=True, mcts=False):
+    # Con mcts=True el primer motor usa MCTS; el rival "motor" sigue siendo minimax con `estrategia`
+    opciones = {"filas": filas, "columnas": columnas, "k": k, "estrategia": estrategia,
+                "tiempo_por_jugada": tiempo, "usar_libro": usar_libro}
+    motor = JugadorMotor(FICHAS[0], bits, mcts, **opciones)
+    if rival == "motor":
+        otro = JugadorMotor(FICHAS[1], bits, **opciones)
+    else:
+        otro = JugadorAleatorio(FICHAS[1], semilla)
+
+    resultados = Counter()
+    latencias = {FICHAS[0]: [], FICHAS[1]: []}
+    # Se alterna quién empieza para no sesgar el reparto de resultados
+    orden = random.Random(semilla)
+    inicio = time.perf_counter()
+    try:
+        for _ in range(partidas):
+            jugadores = (motor, otro) if orden.random() < 0.5 else (otro, motor)
+            ganador, tiempos = jugar_partida(jugadores, filas, columnas, k)
+            resultados[ganador or "empate"] += 1
+            for ficha, valores in tiempos.items():
+                latencias[ficha].extend(valores)
+    finally:
+        motor.cerrar()
+        otro.cerrar()
+    return resultados, latencias, time.perf_counter() - inicio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partidas sin interfaz entre motores (o contra un jugador aleatorio)")
+    parser.add_argument("--partidas", type=int, default=1000)
+    parser.add_argument("--rival", choices=("motor", "aleatorio"), default="aleatorio")
+    parser.add_argument("--estrategia", choices=ESTRATEGIAS, default="alfabeta")
+    parser.add_argument("--bits", action="store_true", help="usa el tablero de bits")
+    parser.add_argument("--sin-libro", action="store_true", help="busca siempre, aunque exista el libro")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--filas", type=int, default=3)
+    parser.add_argument("--columnas", type=int, default=3)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--tiempo", type=float, default=None, help="segundos por jugada del motor")
+    parser.add_argument("--mcts", action="store_true", help=f"el motor {FICHAS[0]} usa MCTS en lugar de minimax")
+    args = parser.parse_args()
+
+    resultados, latencias, segundos = autojuego(args.partidas, args.rival, args.estrategia, args.bits, args.semilla,
+                                                args.filas, args.columnas, args.k, args.tiempo,
+                                                not args.sin_libro, args.mcts)
+    print(f"{args.partidas} partidas en {segundos:.2f} s ({args.partidas / segundos:,.1f} partidas/s)")
+    for ficha in FICHAS:
+        tiempos = latencias[ficha]
+        if tiempos:
+            nombre = "motor" if ficha == FICHAS[0] or args.rival == "motor" else "aleatorio"
+            if ficha == FICHAS[0] and args.mcts:
+                nombre = "mcts"
+            print(f"{ficha} ({nombre}): {len(tiempos)} jugadas, "
+                  f"latencia media {1000 * sum(tiempos) / len(tiempos):.3f} ms")
+    for resultado in (FICHAS[0], FICHAS[1], "empate"):
+        print(f"{resultado}: {resultados[resultado]} ({100 * resultados[resultado] / args.partidas:.1f}%)")
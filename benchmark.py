@@ -0,0 +1,221 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import anchura_misioneros
+import tresenraya_minimax
+from poda_AB import TresEnRaya, TresEnRayaBits, nuevo_contador
+
+RUTA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_base.json")
+
+# Posiciones fijas del 3x3 con la IA (X) al turno, de la apertura al final de la partida
+CORPUS = {
+    "apertura_vacio": "         ",
+    "apertura_esquina": "O        ",
+    "apertura_centro": "    O    ",
+    "medio_diagonal": "X   O   O",
+    "medio_cruzado": "XO  X   O",
+    "medio_lateral": "O  XO    ",
+    "final_centro": "XOXO O   ",
+    "final_columna": "XOX OXO  ",
+    "final_esquina": "OXOXO X  ",
+    "final_mate": "XOXOXO   ",
+}
+
+# Tamaños del problema de los misioneros: (misioneros, caníbales, capacidad del bote)
+CASOS_RIO = [(3, 3, 2), (5, 5, 3), (100, 100, 4), (1000, 1000, 4), (100, 50, 5), (300, 150, 5)]
+
+
+class MinimaxContado(tresenraya_minimax.TresEnRaya):
+    # El minimax sin poda no cuenta nodos: se cuentan las llamadas recursivas
+    def __init__(self):
+        super().__init__(usar_libro=False, silencioso=True)
+        self.nodos = 0
+
+    def minimax(self, profundidad, es_maximizando):
+        self.nodos += 1
+        return super().minimax(profundidad, es_maximizando)
+
+
+class MinimaxBitsContado(tresenraya_minimax.TresEnRayaBits):
+    def __init__(self):
+        super().__init__(usar_libro=False, silencioso=True)
+        self.nodos = 0
+
+    def minimax(self, profundidad, es_maximizando):
+        self.nodos += 1
+        return super().minimax(profundidad, es_maximizando)
+
+
+# Cada caso es una función que prepara lo necesario (fuera del tiempo medido) y devuelve
+# otra que ejecuta la búsqueda y devuelve (nodos, valor)
+
+def caso_minimax(tablero, clase=MinimaxContado):
+    def preparar():
+        motor = clase()
+        motor.tablero[:] = list(tablero)
+
+        def ejecutar():
+            valor = motor.minimax(0, True)
+            return motor.nodos, valor
+        return ejecutar
+    return preparar
+
+
+def caso_minimax_ab(tablero, clase):
+    def preparar():
+        # Motor nuevo en cada repetición: la tabla de transposición empieza vacía
+        motor = clase(usar_libro=False, silencioso=True)
+        motor.tablero[:] = list(tablero)
+        motor.sincronizar()
+
+        def ejecutar():
+            contador = nuevo_contador()
+            valor = motor.minimax_ab(0, True, float("-inf"), float("inf"), contador)
+            return contador["evaluados"], valor
+        return ejecutar
+    return preparar
+
+
+def caso_rio(misioneros, canibales, capacidad, metodo="bfs"):
+    if metodo == "numpy":
+        # NumPy solo hace falta para estos casos
+        from misioneros_vectorizado import vectorized_breadth_first_search as buscar
+    else:
+        buscar = anchura_misioneros.SEARCHES[metodo]
+
+    def ejecutar():
+        estadisticas = {}
+        solucion = buscar(misioneros, canibales, capacidad, estadisticas)
+        longitud = 0
+        while solucion is not None and solucion.parent is not None:
+            longitud += 1
+            solucion = solucion.parent
+        return estadisticas["expanded"], longitud
+    return lambda: ejecutar
+
+
+def generar_casos():
+    casos = {}
+    for nombre, tablero in CORPUS.items():
+        casos[f"minimax/{nombre}"] = caso_minimax(tablero)
+        casos[f"minimax_bits/{nombre}"] = caso_minimax(tablero, MinimaxBitsContado)
+        casos[f"minimax_ab/{nombre}"] = caso_minimax_ab(tablero, TresEnRaya)
+        casos[f"minimax_ab_bits/{nombre}"] = caso_minimax_ab(tablero, TresEnRayaBits)
+    for misioneros, canibales, capacidad in CASOS_RIO:
+        for metodo, prefijo in (("bfs", "bfs"), ("numpy", "bfs_numpy"), ("astar", "astar"),
+                                ("bidirectional", "bidireccional")):
+            casos[f"{prefijo}/{misioneros}m{canibales}c{capacidad}b"] = caso_rio(misioneros, canibales, capacidad, metodo)
+    return casos
+
+
+def medir(preparar, repeticiones, tiempo_minimo=0.2, max_repeticiones=1000):
+    # Los casos de microsegundos se repiten hasta sumar tiempo_minimo para que la mediana sea estable.
+    # Como en timeit, el recolector de basura se desactiva mientras se mide.
+    # Los tiempos se toman sin tracemalloc (lo ralentiza todo); la memoria pico, en una pasada aparte
+    tiempos = []
+    while len(tiempos) < repeticiones or (sum(tiempos) < tiempo_minimo and len(tiempos) < max_repeticiones):
+        ejecutar = preparar()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            nodos, valor = ejecutar()
+            tiempos.append(time.perf_counter() - inicio)
+        finally:
+            gc.enable()
+    ejecutar = preparar()
+    tracemalloc.start()
+    try:
+        ejecutar()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"segundos": statistics.median(tiempos), "minimo": min(tiempos), "repeticiones": len(tiempos),
+            "nodos": nodos, "valor": valor, "memoria_pico": pico}
+
+
+def calibrar(repeticiones=20):
+    # Carga fija de Python puro: la velocidad de la máquina varía entre ejecuciones y con ella
+    # se escalan los tiempos de la referencia antes de comparar
+    def carga():
+        total = 0
+        for i in range(100000):
+            total += i * i % 7
+        return total
+
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        carga()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def comparar(resultados, base, umbral, escala=1.0):
+    # Regresión: el mejor tiempo empeora más del umbral, crecen los nodos o cambia el valor devuelto.
+    # Se compara el mínimo y no la mediana: es lo que menos varía con la carga de la máquina
+    regresiones = []
+    for nombre, actual in resultados.items():
+        anterior = base.get(nombre)
+        if anterior is None:
+            continue
+        if actual["valor"] != anterior["valor"]:
+            regresiones.append(f"{nombre}: valor {anterior['valor']} -> {actual['valor']}")
+        if actual["nodos"] > anterior["nodos"]:
+            regresiones.append(f"{nombre}: nodos {anterior['nodos']} -> {actual['nodos']}")
+        esperado = anterior["minimo"] * escala
+        if actual["minimo"] > esperado * (1 + umbral):
+            regresiones.append(f"{nombre}: {1000 * esperado:.3f} ms -> {1000 * actual['minimo']:.3f} ms "
+                               f"(+{100 * (actual['minimo'] / esperado - 1):.0f}%)")
+    return regresiones
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempos, nodos y memoria de las búsquedas del repositorio")
+    parser.add_argument("--repeticiones", type=int, default=5, help="mínimo de repeticiones por caso")
+    parser.add_argument("--filtro", default="", help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--salida", help="escribe los resultados en este JSON")
+    parser.add_argument("--base", default=RUTA_BASE, help="JSON de referencia con el que comparar")
+    parser.add_argument("--guardar-base", action="store_true", help="guarda los resultados como nueva referencia")
+    parser.add_argument("--umbral", type=float, default=0.15, help="empeoramiento de tiempo tolerado (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    calibracion = calibrar()
+    resultados = {}
+    for nombre, preparar in generar_casos().items():
+        if args.filtro not in nombre:
+            continue
+        resultados[nombre] = medir(preparar, args.repeticiones)
+        r = resultados[nombre]
+        print(f"{nombre:34} {1000 * r['segundos']:10.3f} ms {r['nodos']:9} nodos {r['memoria_pico'] / 1024:9.1f} KiB"
+              f"  valor {r['valor']}")
+
+    calibracion = min(calibracion, calibrar())
+    informe = {"calibracion": calibracion, "python": platform.python_version(), "implementacion": platform.python_implementation(),
+               "maquina": platform.machine(), "sistema": platform.platform(), "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+               "repeticiones": args.repeticiones, "resultados": resultados}
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+    if args.guardar_base:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"Referencia guardada en {args.base}")
+    elif os.path.exists(args.base):
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        escala = calibracion / base["calibracion"]
+        regresiones = comparar(resultados, base["resultados"], args.umbral, escala)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones respecto a {args.base}:")
+            for regresion in regresiones:
+                print(f"  {regresion}")
+            sys.exit(1)
+        print(f"\nSin regresiones respecto a {args.base} (umbral {100 * args.umbral:.0f}%, "
+              f"máquina a {1 / escala:.2f}x la velocidad de la referencia)")
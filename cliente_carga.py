@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+from telemetria import MuestreoAcotado, percentil
+
+# Generador de carga para servidor.py: cada jugador simulado abre su conexión y encadena
+# partidas con jugadas al azar, midiendo la latencia de cada petición desde el cliente
+
+
+async def conectar(host, puerto, unix):
+    if unix is not None:
+        return await asyncio.open_unix_connection(unix, limit=1 << 16)
+    return await asyncio.open_connection(host, puerto, limit=1 << 16)
+
+
+async def pedir(lector, escritor, peticion):
+    escritor.write(json.dumps(peticion).encode() + b"\n")
+    await escritor.drain()
+    respuesta = json.loads(await lector.readline())
+    if "error" in respuesta:
+        raise RuntimeError(f"El servidor respondió con un error: {respuesta['error']}")
+    return respuesta
+
+
+async def jugador(host, puerto, unix, partidas, filas, columnas, k, semilla, latencias, resultados):
+    azar = random.Random(semilla)
+    lector, escritor = await conectar(host, puerto, unix)
+    try:
+        for _ in range(partidas):
+            peticion = {"op": "nueva", "filas": filas, "columnas": columnas, "k": k,
+                        "empieza": azar.choice(("humano", "ia"))}
+            while True:
+                inicio = time.perf_counter()
+                estado = await pedir(lector, escritor, peticion)
+                latencias.agregar(time.perf_counter() - inicio)
+                if estado["terminada"]:
+                    break
+                libres = [i for i, casilla in enumerate(estado["tablero"]) if casilla == " "]
+                peticion = {"op": "mover", "sesion": estado["sesion"], "posicion": azar.choice(libres)}
+            resultados[estado["ganador"] or "empate"] += 1
+            await pedir(lector, escritor, {"op": "cerrar", "sesion": estado["sesion"]})
+    finally:
+        escritor.close()
+
+
+async def generar_carga(host="127.0.0.1", puerto=8765, unix=None, jugadores=100, partidas=10,
+                        filas=3, columnas=3, k=3, semilla=0, muestras=100000):
+    latencias = MuestreoAcotado(muestras, semilla)
+    resultados = Counter()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(jugador(host, puerto, unix, partidas, filas, columnas, k, semilla + i, latencias, resultados)
+                           for i in range(jugadores)))
+    segundos = time.perf_counter() - inicio
+    lector, escritor = await conectar(host, puerto, unix)
+    try:
+        servidor = await pedir(lector, escritor, {"op": "estadisticas"})
+    finally:
+        escritor.close()
+    return latencias, resultados, segundos, servidor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga concurrente para servidor.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", help="ruta del socket Unix del servidor")
+    parser.add_argument("--jugadores", type=int, default=100, help="conexiones (y sesiones) simultáneas")
+    parser.add_argument("--partidas", type=int, default=10, help="partidas por jugador")
+    parser.add_argument("--filas", type=int, default=3)
+    parser.add_argument("--columnas", type=int, default=3)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    latencias, resultados, segundos, servidor = asyncio.run(generar_carga(
+        args.host, args.puerto, args.unix, args.jugadores, args.partidas, args.filas, args.columnas, args.k,
+        args.semilla))
+    muestra = list(latencias)
+    print(f"{latencias.vistos} peticiones en {segundos:.2f} s ({latencias.vistos / segundos:,.1f} pet/s)")
+    print(f"Latencia en el cliente: p50 {1000 * percentil(muestra, 50):.3f} ms, p99 {1000 * percentil(muestra, 99):.3f} ms")
+    partidas = sum(resultados.values())
+    for resultado in ("X", "O", "empate"):
+        print(f"{resultado}: {resultados[resultado]} ({100 * resultados[resultado] / partidas:.1f}%)")
+    print(f"Servidor: {json.dumps(servidor, ensure_ascii=False)}")
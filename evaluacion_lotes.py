@@ -0,0 +1,60 @@
+import sys
+import time
+
+import numpy as np
+
+from geometria import generar_lineas
+
+# Codificación de las casillas en los arrays de tableros
+VACIA = 0
+IA = 1
+HUMANO = 2
+
+
+def codificar_tableros(tableros, jugador_ia="X", jugador_humano="O"):
+    # Lista de tableros (listas de " ", ficha IA, ficha humano) -> array N x casillas de int8
+    codigos = {" ": VACIA, jugador_ia: IA, jugador_humano: HUMANO}
+    return np.array([[codigos[casilla] for casilla in tablero] for tablero in tableros], dtype=np.int8)
+
+
+def evaluar_lote(tableros, filas=3, columnas=3, k=3, tamano_bloque=1 << 16):
+    # Versión vectorizada de evaluar_heuristica y verificar_ganador para N tableros a la vez.
+    # Devuelve (f_valor, lineas_ia, lineas_humano, ganador) como arrays de longitud N;
+    # ganador vale VACIA, IA o HUMANO según la primera línea completa, igual que verificar_ganador
+    tableros = np.asarray(tableros, dtype=np.int8)
+    if tableros.ndim != 2 or tableros.shape[1] != filas * columnas:
+        raise ValueError(f"Se esperaba un array N x {filas * columnas}, no {tableros.shape}")
+    # reshape: sin líneas (k mayor que el tablero) el array sigue siendo de 0 x k
+    lineas = np.array(generar_lineas(filas, columnas, k), dtype=np.intp).reshape(-1, k)
+
+    total = tableros.shape[0]
+    lineas_ia = np.empty(total, dtype=np.int16)
+    lineas_humano = np.empty(total, dtype=np.int16)
+    ganador = np.full(total, VACIA, dtype=np.int8)
+    # Por bloques para que el array N x líneas x k no crezca sin límite
+    for inicio in range(0, total, tamano_bloque):
+        valores = tableros[inicio:inicio + tamano_bloque][:, lineas]
+        es_ia = valores == IA
+        es_humano = valores == HUMANO
+        fin = inicio + valores.shape[0]
+        lineas_ia[inicio:fin] = np.count_nonzero(~es_humano.any(axis=2), axis=1)
+        lineas_humano[inicio:fin] = np.count_nonzero(~es_ia.any(axis=2), axis=1)
+        if not len(lineas):
+            continue  # nadie puede ganar
+
+        completa_ia = es_ia.all(axis=2)
+        completa = completa_ia | es_humano.all(axis=2)
+        primera = completa.argmax(axis=1)
+        gana_ia = completa_ia[np.arange(valores.shape[0]), primera]
+        ganador[inicio:fin] = np.where(completa.any(axis=1), np.where(gana_ia, IA, HUMANO), VACIA)
+
+    return lineas_ia - lineas_humano, lineas_ia, lineas_humano, ganador
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    tableros = np.random.default_rng(0).integers(0, 3, size=(n, 9), dtype=np.int8)
+    inicio = time.perf_counter()
+    evaluar_lote(tableros)
+    segundos = time.perf_counter() - inicio
+    print(f"{n} tableros evaluados en {segundos:.2f} s ({n / segundos:,.0f} tableros/s)")
@@ -0,0 +1,45 @@
+def generar_lineas(filas=3, columnas=3, k=3):
+    # Todos los segmentos de k casillas en horizontal, vertical y ambas diagonales.
+    # En el 3x3 el orden coincide con el de las comprobaciones originales (filas, columnas, diagonales).
+    direcciones = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    lineas = []
+    for df, dc in direcciones:
+        for f in range(filas):
+            for c in range(columnas):
+                fin_f, fin_c = f + df * (k - 1), c + dc * (k - 1)
+                if 0 <= fin_f < filas and 0 <= fin_c < columnas:
+                    lineas.append([(f + df * i) * columnas + c + dc * i for i in range(k)])
+    return lineas
+
+
+def generar_simetrias(filas=3, columnas=3):
+    # Permutaciones que conservan el tablero: las 8 del grupo D4 si es cuadrado,
+    # las 4 reflexiones/rotación de 180 si es rectangular.
+    # simetria[j] = casilla original que ocupa la posición j en el tablero transformado
+    def transformar(funcion):
+        return tuple(funcion(j // columnas, j % columnas) for j in range(filas * columnas))
+
+    simetrias = [
+        transformar(lambda f, c: f * columnas + c),
+        transformar(lambda f, c: f * columnas + (columnas - 1 - c)),
+        transformar(lambda f, c: (filas - 1 - f) * columnas + c),
+        transformar(lambda f, c: (filas - 1 - f) * columnas + (columnas - 1 - c)),
+    ]
+    if filas == columnas:
+        n = filas
+        simetrias += [
+            transformar(lambda f, c: c * n + f),
+            transformar(lambda f, c: (n - 1 - c) * n + f),
+            transformar(lambda f, c: c * n + (n - 1 - f)),
+            transformar(lambda f, c: (n - 1 - c) * n + (n - 1 - f)),
+        ]
+    return simetrias
+
+
+def inversas(simetrias):
+    # inversa[casilla] = posición de la casilla dentro del tablero transformado
+    return [tuple(s.index(i) for i in range(len(s))) for s in simetrias]
+
+
+def casilla_central(filas=3, columnas=3):
+    return (filas // 2) * columnas + columnas // 2
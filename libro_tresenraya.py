@@ -0,0 +1,124 @@
+import mmap
+import os
+import sys
+
+from geometria import generar_lineas
+from tablero_bits import TableroBits
+
+# Libro de juego perfecto para el 3x3: para cada posición (vista desde el jugador que mueve)
+# guarda el valor minimax y la mejor jugada. Índice en base 3: 0 vacía, 1 propia, 2 rival.
+RUTA_LIBRO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "libro_tresenraya.bin")
+MAGIA = b"TER1"
+POSICIONES = 3 ** 9
+SIN_MOVIMIENTO = 0xFF
+LINEAS = generar_lineas(3, 3, 3)
+# Mismo valor de victoria que TresEnRaya en el 3x3 (casillas + líneas + 1)
+VICTORIA = 9 + len(LINEAS) + 1
+
+POTENCIAS = [3 ** i for i in range(9)]
+TERNARIO = [sum(POTENCIAS[i] for i in range(9) if bits >> i & 1) for bits in range(1 << 9)]
+
+
+def indice_posicion(tablero, ficha_turno):
+    if isinstance(tablero, TableroBits):
+        propias = tablero.bits[tablero.indices[ficha_turno]]
+        rivales = (tablero.bits[0] | tablero.bits[1]) & ~propias
+        return TERNARIO[propias] + 2 * TERNARIO[rivales]
+    indice = 0
+    for i, casilla in enumerate(tablero):
+        if casilla == ficha_turno:
+            indice += POTENCIAS[i]
+        elif casilla != " ":
+            indice += 2 * POTENCIAS[i]
+    return indice
+
+
+def _acortar(valor):
+    # Un ply más lejos del final: la victoria vale un punto menos y la derrota uno más
+    if valor > 0:
+        return valor - 1
+    if valor < 0:
+        return valor + 1
+    return 0
+
+
+def resolver():
+    # Negamax completo sobre todas las posiciones alcanzables. Los valores coinciden con los
+    # de minimax_ab (VICTORIA - profundidad) y, a igualdad, se elige la casilla de menor índice.
+    valores = {}
+    mejores = {}
+
+    def gana(casillas, ficha):
+        return any(casillas[a] == casillas[b] == casillas[c] == ficha for a, b, c in LINEAS)
+
+    def negamax(casillas):
+        if casillas in valores:
+            return valores[casillas]
+        mejor_valor = None
+        mejor_movimiento = SIN_MOVIMIENTO
+        # Tras mover se intercambian los papeles: lo propio pasa a ser del rival
+        intercambiado = tuple((0, 2, 1)[c] for c in casillas)
+        for movimiento in range(9):
+            if casillas[movimiento] != 0:
+                continue
+            hijo = intercambiado[:movimiento] + (2,) + intercambiado[movimiento + 1:]
+            if gana(hijo, 2):
+                puntaje = VICTORIA
+            elif 0 not in hijo:
+                puntaje = 0
+            else:
+                puntaje = _acortar(-negamax(hijo))
+            if mejor_valor is None or puntaje > mejor_valor:
+                mejor_valor = puntaje
+                mejor_movimiento = movimiento
+        valores[casillas] = mejor_valor
+        mejores[casillas] = mejor_movimiento
+        return mejor_valor
+
+    negamax((0,) * 9)
+    return valores, mejores
+
+
+def construir_libro(ruta=RUTA_LIBRO):
+    valores, mejores = resolver()
+    datos = bytearray(MAGIA) + bytearray([0, SIN_MOVIMIENTO]) * POSICIONES
+    for casillas, valor in valores.items():
+        indice = sum(c * POTENCIAS[i] for i, c in enumerate(casillas))
+        datos[len(MAGIA) + 2 * indice] = valor & 0xFF
+        datos[len(MAGIA) + 2 * indice + 1] = mejores[casillas]
+    with open(ruta, "wb") as f:
+        f.write(datos)
+    return len(valores)
+
+
+class LibroAperturas:
+    def __init__(self, ruta=RUTA_LIBRO):
+        with open(ruta, "rb") as f:
+            self.datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.datos[:len(MAGIA)] != MAGIA or len(self.datos) != len(MAGIA) + 2 * POSICIONES:
+            self.datos.close()
+            raise ValueError(f"{ruta} no es un libro de Tres en Raya válido")
+
+    def consultar(self, tablero, ficha_turno):
+        # Devuelve (valor, mejor_movimiento) para quien mueve, o None si la posición no está
+        desplazamiento = len(MAGIA) + 2 * indice_posicion(tablero, ficha_turno)
+        movimiento = self.datos[desplazamiento + 1]
+        if movimiento == SIN_MOVIMIENTO:
+            return None
+        valor = self.datos[desplazamiento]
+        return (valor - 256 if valor > 127 else valor), movimiento
+
+    def cerrar(self):
+        self.datos.close()
+
+
+def cargar_libro(ruta=RUTA_LIBRO):
+    if not os.path.exists(ruta):
+        return None
+    return LibroAperturas(ruta)
+
+
+if __name__ == "__main__":
+    ruta = sys.argv[1] if len(sys.argv) > 1 else RUTA_LIBRO
+    total = construir_libro(ruta)
+    print(f"Libro generado en {ruta}: {total} posiciones resueltas ({os.path.getsize(ruta)} bytes)")
@@ -0,0 +1,299 @@
+import math
+import random
+import time
+
+from poda_AB import TresEnRaya, _llamar_trabajador
+from tablero_bits import MotorBits
+from telemetria import escribir_jsonl
+
+# Partidas simuladas por jugada cuando no se da ningún presupuesto (solo pasa en el 3x3 clásico)
+ITERACIONES_POR_DEFECTO = 10000
+POLITICAS_PLAYOUT = ("aleatoria", "heuristica")
+
+
+class Nodo:
+    # `jugador` es quien hizo `movimiento` para llegar aquí; victorias cuenta desde su punto de vista
+    __slots__ = ("movimiento", "jugador", "prior", "visitas", "victorias", "hijos", "sin_probar", "terminal")
+
+    def __init__(self, movimiento, jugador, prior=0.0, terminal=None):
+        self.movimiento = movimiento
+        self.jugador = jugador
+        self.prior = prior
+        self.visitas = 0
+        self.victorias = 0.0
+        self.hijos = []
+        self.sin_probar = None  # [(prior, movimiento)] por expandir, el mejor al final; None hasta la primera visita
+        self.terminal = terminal  # ficha ganadora, "" si es empate, None si la partida sigue
+
+
+class MotorMCTS:
+    # Mezcla para TresEnRaya: sustituye la búsqueda minimax por Monte Carlo Tree Search (UCT).
+    # Es anytime: con límite de tiempo o de partidas simuladas (nodos_por_jugada / limite_nodos)
+    # devuelve siempre la jugada más visitada hasta ese momento. La heurística de líneas abiertas
+    # ordena la expansión y suma un sesgo que se diluye con las visitas; el árbol de la jugada
+    # anterior se conserva si la posición actual sale de él. Con procesos > 1 cada proceso hace
+    # su propio árbol desde la raíz y se suman las visitas de las jugadas de la raíz
+    def __init__(self, *args, exploracion=1.4, peso_prior=1.0, politica_playout="heuristica", semilla=None,
+                 reutilizar_arbol=True, **kwargs):
+        if politica_playout not in POLITICAS_PLAYOUT:
+            raise ValueError(f"Política de simulación desconocida: {politica_playout}")
+        super().__init__(*args, **kwargs)
+        self.exploracion = exploracion
+        self.peso_prior = peso_prior
+        self.politica_playout = politica_playout
+        self.azar = random.Random(semilla)
+        self.reutilizar_arbol = reutilizar_arbol
+        self.arbol = None  # (tablero de la raíz, raíz) de la última búsqueda
+
+    def configuracion_trabajador(self):
+        configuracion = super().configuracion_trabajador()
+        configuracion.update(exploracion=self.exploracion, peso_prior=self.peso_prior,
+                             politica_playout=self.politica_playout)
+        return configuracion
+
+    def nueva_partida(self):
+        super().nueva_partida()
+        self.arbol = None
+
+    def otro(self, jugador):
+        return self.jugador_humano if jugador == self.jugador_ia else self.jugador_ia
+
+    def resultado(self, jugador):
+        # Tras una jugada de `jugador`: ficha ganadora, "" si el tablero se llenó o None si sigue
+        if self.lineas_completas[jugador]:
+            return jugador
+        return "" if self.vacias == 0 else None
+
+    def expandir(self, nodo):
+        # Prior de cada jugada: líneas abiertas tras hacerla, desde el punto de vista de quien mueve, en [0, 1]
+        jugador = self.otro(nodo.jugador)
+        escala = 2 * len(self.lineas)
+        candidatos = []
+        for movimiento in self.movimientos_disponibles():
+            self.hacer_movimiento(movimiento, jugador)
+            if self.lineas_completas[jugador]:
+                prior = 1.0
+            else:
+                f_valor = self.heuristica_incremental()[0]
+                prior = 0.5 + (f_valor if jugador == self.jugador_ia else -f_valor) / escala
+            self.deshacer_movimiento(movimiento)
+            candidatos.append((prior, movimiento))
+        candidatos.sort()
+        nodo.sin_probar = candidatos
+
+    def simular(self, jugador):
+        # Partida hasta el final desde la posición actual, moviendo `jugador`. Devuelve la ficha
+        # ganadora o "". Con la política heurística cada jugada es la mejor de dos al azar
+        azar = self.azar
+        libres = list(self.movimientos_disponibles())
+        hechas = []
+        heuristica = self.politica_playout == "heuristica"
+        while True:
+            i = azar.randrange(len(libres))
+            if heuristica and len(libres) > 1:
+                j = azar.randrange(len(libres))
+                if j != i and self.puntuar(libres[j], jugador) > self.puntuar(libres[i], jugador):
+                    i = j
+            movimiento = libres[i]
+            libres[i] = libres[-1]
+            libres.pop()
+            self.hacer_movimiento(movimiento, jugador)
+            hechas.append(movimiento)
+            if self.lineas_completas[jugador]:
+                ganador = jugador
+                break
+            if not libres:
+                ganador = ""
+                break
+            jugador = self.otro(jugador)
+        for movimiento in reversed(hechas):
+            self.deshacer_movimiento(movimiento)
+        return ganador
+
+    def puntuar(self, movimiento, jugador):
+        self.hacer_movimiento(movimiento, jugador)
+        if self.lineas_completas[jugador]:
+            puntos = float("inf")
+        else:
+            _, lineas_ia, lineas_humano = self.heuristica_incremental()
+            puntos = lineas_ia - lineas_humano if jugador == self.jugador_ia else lineas_humano - lineas_ia
+        self.deshacer_movimiento(movimiento)
+        return puntos
+
+    def iterar(self, raiz):
+        # Selección por UCT con sesgo del prior, expansión de un hijo, simulación y retropropagación
+        exploracion = self.exploracion
+        peso_prior = self.peso_prior
+        nodo = raiz
+        camino = [raiz]
+        while nodo.terminal is None and nodo.sin_probar == [] and nodo.hijos:
+            log_visitas = math.log(nodo.visitas)
+            mejor = None
+            mejor_valor = float("-inf")
+            for hijo in nodo.hijos:
+                visitas = hijo.visitas
+                valor = (hijo.victorias / visitas + exploracion * math.sqrt(log_visitas / visitas)
+                         + peso_prior * hijo.prior / (visitas + 1))
+                if valor > mejor_valor:
+                    mejor, mejor_valor = hijo, valor
+            nodo = mejor
+            self.hacer_movimiento(nodo.movimiento, nodo.jugador)
+            camino.append(nodo)
+        if nodo.terminal is None:
+            if nodo.sin_probar is None:
+                self.expandir(nodo)
+            prior, movimiento = nodo.sin_probar.pop()
+            jugador = self.otro(nodo.jugador)
+            self.hacer_movimiento(movimiento, jugador)
+            hijo = Nodo(movimiento, jugador, prior, self.resultado(jugador))
+            nodo.hijos.append(hijo)
+            nodo = hijo
+            camino.append(nodo)
+        ganador = nodo.terminal if nodo.terminal is not None else self.simular(self.otro(nodo.jugador))
+        for nodo in camino:
+            nodo.visitas += 1
+            if ganador == nodo.jugador:
+                nodo.victorias += 1
+            elif ganador == "":
+                nodo.victorias += 0.5
+        for nodo in reversed(camino[1:]):
+            self.deshacer_movimiento(nodo.movimiento)
+
+    def buscar_mcts(self, raiz, tiempo_limite, iteraciones):
+        # Itera hasta agotar el presupuesto. Una simulación en un tablero grande cuesta lo que miles de
+        # lecturas del reloj, así que el reloj y la cancelación del Ponderador se miran antes de cada una
+        # (siempre se hace al menos una, para que la raíz tenga algún hijo que elegir)
+        fin = time.perf_counter() + tiempo_limite if tiempo_limite is not None else None
+        hechas = 0
+        while iteraciones is None or hechas < iteraciones:
+            if hechas and (fin is not None and time.perf_counter() >= fin
+                           or self.cancelacion is not None and self.cancelacion.is_set()):
+                break
+            self.iterar(raiz)
+            hechas += 1
+        return hechas
+
+    def raiz_reutilizada(self, tablero):
+        # Si desde la raíz anterior se llega a `tablero` con una jugada de la IA y otra del humano,
+        # ese nieto (con todas sus visitas) es la nueva raíz
+        if not self.reutilizar_arbol or self.arbol is None:
+            return None
+        tablero_anterior, raiz = self.arbol
+        cambios = [i for i in range(self.casillas) if tablero_anterior[i] != tablero[i]]
+        if len(cambios) != 2 or any(tablero_anterior[i] != " " for i in cambios):
+            return None
+        jugada_ia = [i for i in cambios if tablero[i] == self.jugador_ia]
+        jugada_humano = [i for i in cambios if tablero[i] == self.jugador_humano]
+        if len(jugada_ia) != 1 or len(jugada_humano) != 1:
+            return None
+        for hijo in raiz.hijos:
+            if hijo.movimiento == jugada_ia[0]:
+                for nieto in hijo.hijos:
+                    if nieto.movimiento == jugada_humano[0]:
+                        return nieto
+        return None
+
+    def buscar_en_trabajador(self, tablero, tiempo_limite, iteraciones, semilla):
+        # Búsqueda de un proceso del modo paralelo: árbol propio y nuevo, devuelve las visitas de la raíz
+        self.tablero[:] = tablero
+        self.sincronizar()
+        self.azar.seed(semilla)
+        raiz = Nodo(None, self.jugador_humano)
+        hechas = self.buscar_mcts(raiz, tiempo_limite, iteraciones)
+        return hechas, {hijo.movimiento: (hijo.visitas, hijo.victorias) for hijo in raiz.hijos}
+
+    def obtener_mejor_movimiento(self, tiempo_limite=None, limite_nodos=None, estrategia=None, procesos=None):
+        # Misma interfaz que la búsqueda minimax; `estrategia` no se usa y limite_nodos cuenta simulaciones
+        if self.libro is not None:
+            movimiento = self.movimiento_de_libro()
+            if movimiento is not None:
+                return movimiento
+
+        tiempo_limite = self.tiempo_por_jugada if tiempo_limite is None else tiempo_limite
+        iteraciones = self.nodos_por_jugada if limite_nodos is None else limite_nodos
+        if tiempo_limite is None and iteraciones is None:
+            iteraciones = ITERACIONES_POR_DEFECTO
+        procesos = self.procesos if procesos is None else procesos
+        inicio = time.perf_counter()
+        self.sincronizar()
+        tablero = list(self.tablero)
+
+        reutilizadas = 0
+        if procesos > 1:
+            ejecutor, _ = self.obtener_ejecutor()
+            semillas = [self.azar.randrange(2 ** 32) for _ in range(procesos)]
+            futuros = [ejecutor.submit(_llamar_trabajador, "buscar_en_trabajador", tablero, tiempo_limite,
+                                       iteraciones, semilla) for semilla in semillas]
+            hechas = 0
+            raiz_visitas = {}
+            for futuro in futuros:
+                hechas_trabajador, visitas_trabajador = futuro.result()
+                hechas += hechas_trabajador
+                for movimiento, (visitas, victorias) in visitas_trabajador.items():
+                    acumulado = raiz_visitas.setdefault(movimiento, [0, 0.0])
+                    acumulado[0] += visitas
+                    acumulado[1] += victorias
+            self.arbol = None
+        else:
+            raiz = self.raiz_reutilizada(tablero)
+            if raiz is None:
+                raiz = Nodo(None, self.jugador_humano)
+            reutilizadas = raiz.visitas
+            hechas = self.buscar_mcts(raiz, tiempo_limite, iteraciones)
+            self.tablero[:] = tablero
+            raiz_visitas = {hijo.movimiento: [hijo.visitas, hijo.victorias] for hijo in raiz.hijos}
+            self.arbol = (tablero, raiz)
+
+        if raiz_visitas:
+            # La jugada más visitada: es la más robusta con pocas simulaciones
+            mejor_movimiento = max(raiz_visitas, key=lambda movimiento: raiz_visitas[movimiento][0])
+        else:
+            mejor_movimiento = self.movimientos_disponibles()[0]
+        segundos = time.perf_counter() - inicio
+
+        self.tablero[mejor_movimiento] = self.jugador_ia
+        f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+        self.tablero[mejor_movimiento] = " "
+        alternativas = [f"Pos {movimiento}: {100 * victorias / visitas:.0f}% en {visitas} simulaciones"
+                        for movimiento, (visitas, victorias) in sorted(raiz_visitas.items())
+                        if movimiento != mejor_movimiento]
+        self.historial_jugadas.append(("IA", mejor_movimiento, f"f(v)={f_valor}", alternativas))
+        visitas, victorias = raiz_visitas.get(mejor_movimiento, (0, 0.0))
+        if self.telemetria:
+            registro = {"turno": len(self.historial_jugadas), "tablero": "".join(self.tablero), "estrategia": "mcts",
+                        "procesos": procesos, "movimiento": mejor_movimiento, "segundos": round(segundos, 6),
+                        "simulaciones": hechas, "simulaciones_reutilizadas": reutilizadas,
+                        "simulaciones_por_segundo": round(hechas / segundos, 1) if segundos else None,
+                        "visitas_raiz": {str(movimiento): valores[0] for movimiento, valores in raiz_visitas.items()}}
+            self.ultima_telemetria = registro
+            if self.ruta_telemetria is not None:
+                escribir_jsonl(self.ruta_telemetria, registro)
+
+        if self.silencioso:
+            return mejor_movimiento
+
+        print(f"\n[Resumen MCTS]")
+        print(f"Simulaciones: {hechas}" + (f" ({procesos} procesos)" if procesos > 1 else "")
+              + (f", más {reutilizadas} reutilizadas del turno anterior" if reutilizadas else ""))
+        print(f"Tiempo: {segundos:.3f} s")
+        if visitas:
+            print(f"Victorias estimadas: {100 * victorias / visitas:.1f}% en {visitas} simulaciones")
+        print(f"IA elige la posición {mejor_movimiento} con heurística: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+        return mejor_movimiento
+
+
+class TresEnRayaMCTS(MotorMCTS, TresEnRaya):
+    pass
+
+
+class TresEnRayaMCTSBits(MotorMCTS, MotorBits, TresEnRaya):
+    # MCTS sobre el tablero de bits
+    pass
+
+
+if __name__ == "__main__":
+    # python mcts.py [filas columnas k]: partida contra MCTS (1 s por jugada fuera del 3x3)
+    import sys
+    filas, columnas, k = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (3, 3, 3)
+    juego = TresEnRayaMCTS(filas, columnas, k, usar_libro=False)
+    juego.jugar()
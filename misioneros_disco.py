@@ -0,0 +1,135 @@
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from anchura_misioneros import State, build_path, print_solution
+from misioneros_vectorizado import decode, encode, expand_layer, move_table
+
+## External-memory version of vectorized_breadth_first_search. Everything that grows with the
+## state space lives in files under `workdir`:
+##   visited.bin   one bit per encoded state (memory-mapped)
+##   parents.bin   encoded parent of every visited state (memory-mapped)
+##   layer_N.bin   the states of BFS layer N, appended chunk by chunk
+## Only `chunk` states of a layer (and their children) are in RAM at any time.
+
+
+def layer_file(workdir, depth):
+    return os.path.join(workdir, "layer_%06d.bin" % depth)
+
+
+def external_breadth_first_search(missionaries=3, cannibals=3, capacity=2, stats=None, workdir=None,
+                                  chunk=1 << 16, keep_files=False):
+    initial_state = State(cannibals, missionaries, 'left', 0, 0)
+    if not initial_state.is_valid():
+        return None
+    if initial_state.is_goal():
+        return initial_state
+    temporary = workdir is None
+    if temporary:
+        workdir = tempfile.mkdtemp(prefix="misioneros_")
+    else:
+        os.makedirs(workdir, exist_ok=True)
+    if stats is not None:
+        ## With keep_files=True this is the only way to find the temporary directory again
+        stats["workdir"] = workdir
+    try:
+        return _search(missionaries, cannibals, capacity, stats, workdir, chunk)
+    finally:
+        if temporary and not keep_files:
+            shutil.rmtree(workdir, ignore_errors=True)
+        elif temporary:
+            print("Search files kept in %s" % workdir, file=sys.stderr)
+
+
+def remove_layers(workdir):
+    for path in glob.glob(os.path.join(workdir, "layer_*.bin")):
+        os.remove(path)
+
+
+def _search(missionaries, cannibals, capacity, stats, workdir, chunk):
+    ## A reused workdir may hold layers from an earlier run: they would be read as this instance's states
+    remove_layers(workdir)
+    moved_missionaries, moved_cannibals = move_table(capacity)
+    size = 2 * (missionaries + 1) * (cannibals + 1)
+    index_type = np.uint32 if size < 2 ** 32 else np.uint64
+    ## New files are sparse: only the pages that get written take disk space
+    visited = np.memmap(os.path.join(workdir, "visited.bin"), dtype=np.uint8, mode="w+", shape=((size + 7) // 8,))
+    parent = np.memmap(os.path.join(workdir, "parents.bin"), dtype=index_type, mode="w+", shape=(size,))
+    start = encode(cannibals, missionaries, 0, missionaries, cannibals)
+    goal = encode(0, 0, 1, missionaries, cannibals)
+    visited[start >> 3] |= 1 << (start & 7)
+    parent[start] = start
+    np.array([start], dtype=index_type).tofile(layer_file(workdir, 0))
+
+    def is_visited(states):
+        return (visited[states >> 3] >> (states & 7).astype(np.uint8)) & 1 == 1
+
+    depth = 0
+    expanded = 0
+    generated = 1
+    found = False
+    while not found:
+        current = layer_file(workdir, depth)
+        total = os.path.getsize(current) // np.dtype(index_type).itemsize
+        if total == 0:
+            break
+        with open(layer_file(workdir, depth + 1), "wb") as following:
+            for offset in range(0, total, chunk):
+                frontier = np.fromfile(current, dtype=index_type, count=chunk,
+                                       offset=offset * np.dtype(index_type).itemsize).astype(np.int64)
+                expanded += frontier.size
+                children, parents = expand_layer(frontier, moved_missionaries, moved_cannibals,
+                                                 missionaries, cannibals)
+                new = ~is_visited(children)
+                children, parents = children[new], parents[new]
+                ## First occurrence within the chunk, in generation order (same parents as the in-memory BFS)
+                children, first = np.unique(children, return_index=True)
+                order = np.argsort(first, kind="stable")
+                children, parents = children[order], parents[first[order]]
+                np.bitwise_or.at(visited, children >> 3, (1 << (children & 7)).astype(np.uint8))
+                parent[children] = parents
+                children.astype(index_type).tofile(following)
+                generated += children.size
+                if visited[goal >> 3] >> (goal & 7) & 1:
+                    found = True
+                    break
+        ## Finished layers are no longer needed: disk use stays at two layers plus the arrays
+        os.remove(current)
+        depth += 1
+    ## The last layer written (the one after the goal, or an empty one) is never expanded
+    remove_layers(workdir)
+    if stats is not None:
+        stats.update(expanded=expanded, generated=generated, layers=depth)
+    if not found:
+        return None
+
+    def key(index):
+        cannibalLeft, missionaryLeft, boat = decode(index, missionaries, cannibals)
+        return cannibalLeft, missionaryLeft, boat == 0
+
+    chain = {}
+    index = goal
+    while index != start:
+        up = int(parent[index])
+        chain[key(index)] = key(up)
+        index = up
+    chain[key(start)] = None
+    return build_path(chain, key(goal), missionaries, cannibals)
+
+
+if __name__ == "__main__":
+    ## python misioneros_disco.py missionaries cannibals capacity [workdir [--print]]
+    missionaries, cannibals, capacity = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (2000, 1000, 5)
+    workdir = sys.argv[4] if len(sys.argv) > 4 else None
+    stats = {}
+    start = time.perf_counter()
+    solution = external_breadth_first_search(missionaries, cannibals, capacity, stats, workdir)
+    seconds = time.perf_counter() - start
+    print("%d states expanded in %d layers, %.2f s" % (stats["expanded"], stats["layers"], seconds))
+    if solution is not None and len(sys.argv) > 5 and sys.argv[5] == "--print":
+        print_solution(solution)
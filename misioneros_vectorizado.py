@@ -0,0 +1,112 @@
+import sys
+import time
+
+import numpy as np
+
+from anchura_misioneros import State, boat_loads, breadth_first_search, build_path, print_solution
+
+## States are encoded as integers: index = (boat * (cannibals + 1) + cannibalLeft) * (missionaries + 1) + missionaryLeft,
+## with boat 0 on the left bank and 1 on the right bank.
+
+
+def move_table(capacity=2):
+    ## Delta table for a boat capacity: one row per load, in the order used by successors().
+    loads = np.array(boat_loads(capacity), dtype=np.int64).reshape(-1, 2)
+    return loads[:, 0], loads[:, 1]
+
+
+def encode(cannibalLeft, missionaryLeft, boat, missionaries, cannibals):
+    return (boat * (cannibals + 1) + cannibalLeft) * (missionaries + 1) + missionaryLeft
+
+
+def decode(index, missionaries, cannibals):
+    missionaryLeft = index % (missionaries + 1)
+    rest = index // (missionaries + 1)
+    return rest % (cannibals + 1), missionaryLeft, rest // (cannibals + 1)
+
+
+def expand_layer(frontier, moved_missionaries, moved_cannibals, missionaries, cannibals):
+    ## All valid children of a whole layer at once, ordered as a FIFO queue would generate them
+    ## (parent by parent, load by load). Returns (children, parents) as flat arrays.
+    cannibalLeft, missionaryLeft, boat = decode(frontier, missionaries, cannibals)
+    direction = np.where(boat == 0, -1, 1)[:, None]
+    newMissionaryLeft = missionaryLeft[:, None] + direction * moved_missionaries[None, :]
+    newCannibalLeft = cannibalLeft[:, None] + direction * moved_cannibals[None, :]
+    newMissionaryRight = missionaries - newMissionaryLeft
+    newCannibalRight = cannibals - newCannibalLeft
+    ## Same rule as State.is_valid
+    valid = (newMissionaryLeft >= 0) & (newMissionaryRight >= 0) \
+        & (newCannibalLeft >= 0) & (newCannibalRight >= 0) \
+        & ((newMissionaryLeft == 0) | (newMissionaryLeft >= newCannibalLeft)) \
+        & ((newMissionaryRight == 0) | (newMissionaryRight >= newCannibalRight))
+    newBoat = np.broadcast_to((1 - boat)[:, None], valid.shape)
+    children = encode(newCannibalLeft[valid], newMissionaryLeft[valid], newBoat[valid], missionaries, cannibals)
+    parents = np.broadcast_to(frontier[:, None], valid.shape)[valid]
+    return children, parents
+
+
+def vectorized_breadth_first_search(missionaries=3, cannibals=3, capacity=2, stats=None):
+    ## Same search (and same solution) as breadth_first_search, but each BFS layer is expanded
+    ## with NumPy over integer-encoded states and deduplicated against a visited bitmap.
+    ## Pays off when layers are wide (M < N); with M == N each layer holds a couple of states.
+    initial_state = State(cannibals, missionaries, 'left', 0, 0)
+    if not initial_state.is_valid():
+        return None
+    if initial_state.is_goal():
+        return initial_state
+    moved_missionaries, moved_cannibals = move_table(capacity)
+    size = 2 * (missionaries + 1) * (cannibals + 1)
+    visited = np.zeros(size, dtype=np.bool_)
+    ## Whole-state-space arrays: int32 halves their memory whenever the indices fit
+    index_type = np.int32 if size < 2 ** 31 else np.int64
+    parent = np.full(size, -1, dtype=index_type)
+    owner = np.empty(size, dtype=index_type)
+    start = encode(cannibals, missionaries, 0, missionaries, cannibals)
+    goal = encode(0, 0, 1, missionaries, cannibals)
+    visited[start] = True
+    frontier = np.array([start], dtype=np.int64)
+    expanded = 0
+    while frontier.size and not visited[goal]:
+        expanded += frontier.size
+        children, parents = expand_layer(frontier, moved_missionaries, moved_cannibals, missionaries, cannibals)
+        new = ~visited[children]
+        children, parents = children[new], parents[new]
+        ## Keep only the first time each child appears in the layer, in generation order: writing the
+        ## positions backwards leaves the smallest one in `owner` (linear, unlike np.unique's sort)
+        positions = np.arange(children.size, dtype=index_type)
+        owner[children[::-1]] = positions[::-1]
+        first = owner[children] == positions
+        children, parents = children[first], parents[first]
+        visited[children] = True
+        parent[children] = parents
+        frontier = children
+    if stats is not None:
+        stats.update(expanded=expanded, generated=int(np.count_nonzero(visited)))
+    if not visited[goal]:
+        return None
+
+    def key(index):
+        cannibalLeft, missionaryLeft, boat = decode(index, missionaries, cannibals)
+        return cannibalLeft, missionaryLeft, boat == 0
+
+    ## Only the solution path is turned back into the parent dict build_path expects
+    chain = {}
+    index = goal
+    while index != -1:
+        up = int(parent[index])
+        chain[key(index)] = key(up) if up != -1 else None
+        index = up
+    return build_path(chain, key(goal), missionaries, cannibals)
+
+
+if __name__ == "__main__":
+    missionaries, cannibals, capacity = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (300, 150, 5)
+    for name, search in (("breadth_first_search", breadth_first_search), ("vectorized", vectorized_breadth_first_search)):
+        stats = {}
+        start = time.perf_counter()
+        solution = search(missionaries, cannibals, capacity, stats)
+        seconds = time.perf_counter() - start
+        print("%s: %d states expanded in %.3f s (%s states/s)"
+              % (name, stats["expanded"], seconds, format(int(stats["expanded"] / seconds), ",")))
+    if len(sys.argv) > 4 and sys.argv[4] == "--print":
+        print_solution(solution)
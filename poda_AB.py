@@ -1,46 +1,162 @@
-import matplotlib.pyplot as plt
-import networkx as nx
+import multiprocessing
 import random
-from copy import deepcopy
+import time
+from concurrent.futures import ProcessPoolExecutor
+from geometria import generar_lineas, generar_simetrias, inversas, casilla_central
+from libro_tresenraya import cargar_libro
+from ponderacion import Ponderador
+from tablero_bits import MotorBits
+from telemetria import EstadisticasBusqueda, MuestreoAcotado, escribir_jsonl
+from transposicion import (TablaTransposicion, EXACTO, COTA_INFERIOR, COTA_SUPERIOR,
+                           valor_a_tabla, valor_desde_tabla)
 
-class TresEnRaya:
+
+class BusquedaInterrumpida(Exception):
+    # Se lanza dentro de minimax_ab cuando se agota el presupuesto de la jugada
     def __init__(self):
-        self.tablero = [" " for _ in range(9)]
-        self.jugador_humano = "O"
-        self.jugador_ia = "X"
+        super().__init__("Presupuesto de búsqueda agotado")
+        self.parcial = None  # mejor resultado de raíz de la iteración interrumpida, si lo hay
+
+
+# Valor del mejor puntaje compartido antes de que ningún trabajador termine una jugada
+SIN_COTA = -(2 ** 31) + 1
+
+
+def nuevo_contador():
+    return {"evaluados": 0, "podados": 0, "re_busquedas": 0, "tt_aciertos": 0, "tt_fallos": 0, "tt_guardados": 0}
+
+
+# Criterios de ordenación de jugadas, de mayor a menor prioridad al combinarse
+ORDENAMIENTOS = ("hash", "killer", "historia", "estatico")
+# Algoritmos de búsqueda; todos devuelven el mismo valor para cada jugada de la raíz
+ESTRATEGIAS = ("minimax", "alfabeta", "negamax", "pvs", "mtdf")
+
+
+def validar_ordenamiento(ordenamiento):
+    ordenamiento = tuple(ordenamiento)
+    for criterio in ordenamiento:
+        if criterio not in ORDENAMIENTOS:
+            raise ValueError(f"Criterio de ordenación desconocido: {criterio}")
+    return tuple(criterio for criterio in ORDENAMIENTOS if criterio in ordenamiento)
+
+
+class TresEnRaya:
+    def __init__(self, filas=3, columnas=3, k=3, capacidad_tt=100000, politica_tt="lru", usar_libro=True,
+                 tiempo_por_jugada=None, nodos_por_jugada=None, ordenamiento=("hash", "killer", "historia"),
+                 estrategia="alfabeta", procesos=1, jugador_ia="X", jugador_humano="O", silencioso=False,
+                 telemetria=False, ruta_telemetria=None, muestras_podados=64, captura_arbol=None,
+                 ponderar=False):
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia de búsqueda desconocida: {estrategia}")
+        # Con k mayor que el tablero no habría ninguna línea y la partida solo podría acabar en empate
+        if not (filas > 0 and columnas > 0 and 1 <= k <= max(filas, columnas)):
+            raise ValueError(f"Tablero no admitido: {filas}x{columnas} con k={k}")
+        self.filas = filas
+        self.columnas = columnas
+        self.k = k
+        self.casillas = filas * columnas
+        self.lineas = generar_lineas(filas, columnas, k)
+        self.simetrias = generar_simetrias(filas, columnas)
+        self.inversas = inversas(self.simetrias)
+        self.lineas_por_casilla = [[indice for indice, linea in enumerate(self.lineas) if pos in linea]
+                                   for pos in range(self.casillas)]
+        # Una victoria siempre vale más que cualquier valor heurístico del horizonte
+        self.victoria = self.casillas + len(self.lineas) + 1
+        self.tablero = [" " for _ in range(self.casillas)]
+        self.jugador_humano = jugador_humano
+        self.jugador_ia = jugador_ia
+        # Sin salida por consola: para usar el motor desde otros programas y en simulaciones masivas
+        self.silencioso = silencioso
         self.historial_jugadas = []  # [(jugador, pos, f(v), alternativas)]
-        self.podados_en_turno = []
+        # Muestra acotada de las jugadas podadas en el turno (la lista completa crecía sin límite)
+        self.podados_en_turno = MuestreoAcotado(muestras_podados)
+        # Telemetría opcional: con ella cada turno deja sus estadísticas en ultima_telemetria
+        # y, si hay ruta, las añade como una línea JSON. Desactivada no cuesta más que un `is None` por nodo
+        self.telemetria = telemetria or ruta_telemetria is not None
+        self.ruta_telemetria = ruta_telemetria
+        self.estadisticas = None
+        self.ultima_telemetria = None
+        # arbol_busqueda.CapturaArbol opcional: guarda en disco el árbol de cada turno, podas incluidas.
+        # Solo la búsqueda en un proceso; los trabajadores de la búsqueda paralela no capturan
+        self.captura_arbol = captura_arbol
+        # La tabla se conserva entre turnos de la misma partida (capacidad_tt=0 la desactiva)
+        self.capacidad_tt = capacidad_tt
+        self.politica_tt = politica_tt
+        self.tabla_transposicion = TablaTransposicion(capacidad_tt, politica_tt) if capacidad_tt else None
+        # Libro generado con `python libro_tresenraya.py`; si no existe se busca siempre
+        es_clasico = (filas, columnas, k) == (3, 3, 3)
+        self.libro = cargar_libro() if usar_libro and es_clasico else None
+        # En tableros grandes la búsqueda completa no termina: sin presupuesto explícito se da 1 s
+        if not es_clasico and tiempo_por_jugada is None and nodos_por_jugada is None:
+            tiempo_por_jugada = 1.0
+        self.tiempo_por_jugada = tiempo_por_jugada
+        self.nodos_por_jugada = nodos_por_jugada
+        self.profundidad_limite = self.casillas
+        self.limite_nodos = None
+        self.fin_busqueda = None
+        # Nodos entre lecturas del reloj, menos cuanto más grande el tablero porque cada nodo cuesta
+        # más: 256 en el 3x3, 16 en el 15x15
+        self.mascara_reloj = (1 << max(0, 12 - self.casillas.bit_length())) - 1
+        # threading.Event que interrumpe la búsqueda en curso (lo usa el Ponderador); se comprueba
+        # junto con el reloj, también en búsquedas sin presupuesto
+        self.cancelacion = None
+        # En jugar(), buscar las respuestas a las jugadas probables del humano mientras este piensa
+        self.ponderar = ponderar
+        # Se puede cambiar entre turnos con validar_ordenamiento(...); () deja el orden por índice
+        self.ordenamiento = validar_ordenamiento(ordenamiento)
+        self.killers = {}  # profundidad -> [jugadas que produjeron corte]
+        self.estrategia = estrategia
+        # Con procesos > 1 las jugadas de la raíz se reparten en un pool que se reutiliza entre turnos
+        # (cada trabajador conserva su propia tabla de transposición); cerrar() lo libera
+        self.procesos = procesos
+        self.ejecutor = None
+        self.mejor_compartido = None
+        self.sincronizar()
+        self.historia = {self.jugador_ia: [0] * self.casillas, self.jugador_humano: [0] * self.casillas}
+
+    def nueva_partida(self):
+        # Deja el motor listo para otra partida sin volver a crear el pool ni abrir el libro
+        self.tablero[:] = [" "] * self.casillas
+        self.historial_jugadas = []
+        self.podados_en_turno.limpiar()
+        self.ultima_telemetria = None
+        if self.tabla_transposicion is not None:
+            self.tabla_transposicion.limpiar()
+        self.killers = {}
+        self.historia = {self.jugador_ia: [0] * self.casillas, self.jugador_humano: [0] * self.casillas}
+        self.sincronizar()
 
     def imprimir_tablero(self):
-        for i in range(0, 9, 3):
-            print(f"{self.tablero[i]} | {self.tablero[i+1]} | {self.tablero[i+2]}")
-            if i < 6:
-                print("---------")
+        for i in range(0, self.casillas, self.columnas):
+            print(" | ".join(self.tablero[i:i + self.columnas]))
+            if i < self.casillas - self.columnas:
+                print("-" * (4 * self.columnas - 3))
 
     def movimientos_disponibles(self):
         return [i for i, casilla in enumerate(self.tablero) if casilla == " "]
 
     def realizar_movimiento(self, posicion, jugador):
         if self.tablero[posicion] == " ":
-            self.tablero[posicion] = jugador
-            print(f"\n{jugador} juega en la posición {posicion}")
-            self.imprimir_tablero()
-            f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
-            print(f"Heurística actual: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+            self.sincronizar()
+            self.hacer_movimiento(posicion, jugador)
+            if not self.silencioso:
+                print(f"\n{jugador} juega en la posición {posicion}")
+                self.imprimir_tablero()
+                f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+                print(f"Heurística actual: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
             return True
         return False
 
     def verificar_ganador(self):
-        for i in range(0, 9, 3):
-            if self.tablero[i] == self.tablero[i + 1] == self.tablero[i + 2] != " ":
-                return self.tablero[i]
-        for i in range(3):
-            if self.tablero[i] == self.tablero[i + 3] == self.tablero[i + 6] != " ":
-                return self.tablero[i]
-        if self.tablero[0] == self.tablero[4] == self.tablero[8] != " ":
-            return self.tablero[0]
-        if self.tablero[2] == self.tablero[4] == self.tablero[6] != " ":
-            return self.tablero[2]
+        for linea in self.lineas:
+            primera = self.tablero[linea[0]]
+            if primera == " ":
+                continue
+            for pos in linea:
+                if self.tablero[pos] != primera:
+                    break
+            else:
+                return primera
         return None
 
     def tablero_lleno(self):
@@ -51,14 +167,9 @@ class TresEnRaya:
 
     def evaluar_heuristica(self):
         def contar_lineas_ganadoras(jugador):
-            lineas_ganadoras = [
-                [0, 1, 2], [3, 4, 5], [6, 7, 8],
-                [0, 3, 6], [1, 4, 7], [2, 5, 8],
-                [0, 4, 8], [2, 4, 6]
-            ]
             conteo = 0
             oponente = self.jugador_humano if jugador == self.jugador_ia else self.jugador_ia
-            for linea in lineas_ganadoras:
+            for linea in self.lineas:
                 valores = [self.tablero[pos] for pos in linea]
                 if oponente not in valores:
                     conteo += 1
@@ -68,77 +179,626 @@ class TresEnRaya:
         lineas_humano = contar_lineas_ganadoras(self.jugador_humano)
         return lineas_ia - lineas_humano, lineas_ia, lineas_humano
 
-    def minimax_ab(self, profundidad, es_maximizando, alpha, beta, contador):
-        if self.verificar_ganador() == self.jugador_ia:
-            return 10 - profundidad
-        if self.verificar_ganador() == self.jugador_humano:
-            return profundidad - 10
-        if self.tablero_lleno():
+    def sincronizar(self):
+        # Recalcula desde cero el estado incremental. Hace falta tras escribir en self.tablero
+        # sin pasar por hacer_movimiento/deshacer_movimiento; la búsqueda lo llama al empezar cada turno
+        fichas = (self.jugador_ia, self.jugador_humano)
+        self.conteo_lineas = {ficha: [0] * len(self.lineas) for ficha in fichas}
+        for indice, linea in enumerate(self.lineas):
+            for pos in linea:
+                if self.tablero[pos] != " ":
+                    self.conteo_lineas[self.tablero[pos]][indice] += 1
+        self.lineas_completas = {ficha: self.conteo_lineas[ficha].count(self.k) for ficha in fichas}
+        # Líneas abiertas de un jugador: las que no tienen ninguna ficha del rival
+        self.lineas_abiertas = {self.jugador_ia: self.conteo_lineas[self.jugador_humano].count(0),
+                                self.jugador_humano: self.conteo_lineas[self.jugador_ia].count(0)}
+        self.vacias = sum(1 for casilla in self.tablero if casilla == " ")
+
+    def hacer_movimiento(self, posicion, jugador):
+        self.tablero[posicion] = jugador
+        self.sumar_a_lineas(posicion, jugador)
+
+    def deshacer_movimiento(self, posicion):
+        self.restar_de_lineas(posicion, self.tablero[posicion])
+        self.tablero[posicion] = " "
+
+    def sumar_a_lineas(self, posicion, jugador):
+        # Solo se actualizan las líneas que pasan por la casilla
+        oponente = self.jugador_humano if jugador == self.jugador_ia else self.jugador_ia
+        propias = self.conteo_lineas[jugador]
+        for linea in self.lineas_por_casilla[posicion]:
+            if propias[linea] == 0:
+                self.lineas_abiertas[oponente] -= 1
+            propias[linea] += 1
+            if propias[linea] == self.k:
+                self.lineas_completas[jugador] += 1
+        self.vacias -= 1
+
+    def restar_de_lineas(self, posicion, jugador):
+        oponente = self.jugador_humano if jugador == self.jugador_ia else self.jugador_ia
+        propias = self.conteo_lineas[jugador]
+        for linea in self.lineas_por_casilla[posicion]:
+            if propias[linea] == self.k:
+                self.lineas_completas[jugador] -= 1
+            propias[linea] -= 1
+            if propias[linea] == 0:
+                self.lineas_abiertas[oponente] += 1
+        self.vacias += 1
+
+    def heuristica_incremental(self):
+        # Igual que evaluar_heuristica, pero en O(1) a partir del estado incremental
+        lineas_ia = self.lineas_abiertas[self.jugador_ia]
+        lineas_humano = self.lineas_abiertas[self.jugador_humano]
+        return lineas_ia - lineas_humano, lineas_ia, lineas_humano
+
+    def evaluar_lote(self, tableros):
+        # Evaluación vectorizada de muchos tableros (array N x casillas o lista de tableros).
+        # NumPy solo se importa aquí, el motor no lo necesita para jugar
+        from evaluacion_lotes import codificar_tableros, evaluar_lote
+        if not hasattr(tableros, "shape"):
+            tableros = codificar_tableros(tableros, self.jugador_ia, self.jugador_humano)
+        return evaluar_lote(tableros, self.filas, self.columnas, self.k)
+
+    def clave_tablero(self, es_maximizando):
+        # Forma canónica del tablero bajo sus simetrías; devuelve también la simetría usada
+        mejor_clave = None
+        mejor_simetria = 0
+        for indice, simetria in enumerate(self.simetrias):
+            clave = "".join([self.tablero[i] for i in simetria])
+            if mejor_clave is None or clave < mejor_clave:
+                mejor_clave = clave
+                mejor_simetria = indice
+        return (mejor_clave, es_maximizando), mejor_simetria
+
+    def iniciar_presupuesto(self, tiempo_limite, limite_nodos):
+        self.fin_busqueda = time.perf_counter() + tiempo_limite if tiempo_limite is not None else None
+        self.limite_nodos = limite_nodos
+
+    def comprobar_presupuesto(self, contador):
+        evaluados = contador["evaluados"]
+        if self.limite_nodos is not None and evaluados >= self.limite_nodos:
+            raise BusquedaInterrumpida()
+        # Consultar el reloj (y la cancelación del Ponderador) cada pocos nodos basta sin encarecer cada nodo
+        if evaluados & self.mascara_reloj == 0 and self.tiempo_agotado():
+            raise BusquedaInterrumpida()
+
+    def tiempo_agotado(self):
+        return (self.fin_busqueda is not None and time.perf_counter() >= self.fin_busqueda
+                or self.cancelacion is not None and self.cancelacion.is_set())
+
+    def ordenar_movimientos(self, movimientos, profundidad, es_maximizando, movimiento_hash=None):
+        if not self.ordenamiento:
+            return movimientos
+        # El orden estático hace y deshace cada jugada: en un tablero grande cuesta más que muchas hojas,
+        # así que el reloj se mira también aquí
+        if "estatico" in self.ordenamiento and self.tiempo_agotado():
+            raise BusquedaInterrumpida()
+        jugador = self.jugador_ia if es_maximizando else self.jugador_humano
+        killers = self.killers.get(profundidad, ())
+        historia = self.historia[jugador]
+
+        def prioridad(movimiento):
+            clave = []
+            for criterio in self.ordenamiento:
+                if criterio == "hash":
+                    clave.append(movimiento == movimiento_hash)
+                elif criterio == "killer":
+                    clave.append(movimiento in killers)
+                elif criterio == "historia":
+                    clave.append(historia[movimiento])
+                else:
+                    # Diferencia de f(v) que produce la jugada, desde el punto de vista de quien mueve
+                    self.hacer_movimiento(movimiento, jugador)
+                    f_valor = self.heuristica_incremental()[0]
+                    self.deshacer_movimiento(movimiento)
+                    clave.append(f_valor if es_maximizando else -f_valor)
+            return clave
+
+        return sorted(movimientos, key=prioridad, reverse=True)
+
+    def registrar_corte(self, movimiento, profundidad, es_maximizando, restante):
+        killers = self.killers.setdefault(profundidad, [])
+        if movimiento not in killers:
+            killers.insert(0, movimiento)
+            del killers[2:]
+        jugador = self.jugador_ia if es_maximizando else self.jugador_humano
+        self.historia[jugador][movimiento] += restante * restante
+
+    def valor_hoja(self, profundidad, contador):
+        # Valor para la IA si el nodo es final o cae en el horizonte; None si hay que expandirlo.
+        # Usa el estado incremental, así que no recorre el tablero
+        if self.lineas_completas[self.jugador_ia]:
+            return self.victoria - profundidad
+        if self.lineas_completas[self.jugador_humano]:
+            return profundidad - self.victoria
+        if self.vacias == 0:
             return 0
+        if self.fin_busqueda is not None or self.limite_nodos is not None or self.cancelacion is not None:
+            self.comprobar_presupuesto(contador)
+        # Horizonte: la jugada de la raíz ya está puesta, así que hay profundidad + 1 plies jugados
+        if self.profundidad_limite - profundidad - 1 <= 0:
+            return self.heuristica_incremental()[0]
+        return None
 
+    def sondear_tabla(self, profundidad, es_maximizando, restante, alpha, beta, contador, signo=1):
+        # La tabla guarda valores desde el punto de vista de la IA; signo=-1 traduce la ventana
+        # de un negamax en el que mueve el humano. Devuelve (clave, simetria, movimiento_hash, alpha, beta, corte)
+        clave, simetria = self.clave_tablero(es_maximizando)
+        entrada = self.tabla_transposicion.buscar(clave)
+        if entrada is None:
+            contador["tt_fallos"] += 1
+            return clave, simetria, None, alpha, beta, None
+        contador["tt_aciertos"] += 1
+        valor, tipo, movimiento_canonico, restante_entrada = entrada
+        movimiento_hash = self.simetrias[simetria][movimiento_canonico]
+        if restante_entrada < restante:
+            return clave, simetria, movimiento_hash, alpha, beta, None
+        valor = signo * valor_desde_tabla(valor, profundidad, len(self.lineas))
+        if tipo == EXACTO:
+            return clave, simetria, movimiento_hash, alpha, beta, valor
+        if (tipo == COTA_INFERIOR) == (signo == 1):
+            alpha = max(alpha, valor)
+        else:
+            beta = min(beta, valor)
+        corte = valor if beta <= alpha else None
+        return clave, simetria, movimiento_hash, alpha, beta, corte
+
+    def guardar_en_tabla(self, clave, simetria, profundidad, restante, resultado, alpha, beta, mejor_movimiento,
+                         contador, signo=1):
+        if resultado <= alpha:
+            tipo = COTA_SUPERIOR if signo == 1 else COTA_INFERIOR
+        elif resultado >= beta:
+            tipo = COTA_INFERIOR if signo == 1 else COTA_SUPERIOR
+        else:
+            tipo = EXACTO
+        self.tabla_transposicion.guardar(clave, (valor_a_tabla(signo * resultado, profundidad, len(self.lineas)), tipo,
+                                                 self.inversas[simetria][mejor_movimiento], restante))
+        contador["tt_guardados"] += 1
+
+    def minimax(self, profundidad, es_maximizando, contador):
+        if self.estadisticas is not None:
+            self.estadisticas.nodo(profundidad)
+        valor = self.valor_hoja(profundidad, contador)
+        if valor is not None:
+            if self.captura_arbol is not None:
+                self.captura_arbol.marcar("hoja")
+            return valor
+
+        captura = self.captura_arbol
+        jugador = self.jugador_ia if es_maximizando else self.jugador_humano
+        mejor_puntaje = float("-inf") if es_maximizando else float("inf")
+        for movimiento in self.movimientos_disponibles():
+            self.hacer_movimiento(movimiento, jugador)
+            contador["evaluados"] += 1
+            if captura is not None:
+                captura.entrar(movimiento, jugador)
+            puntaje = self.minimax(profundidad + 1, not es_maximizando, contador)
+            if captura is not None:
+                captura.salir(puntaje)
+            self.deshacer_movimiento(movimiento)
+            mejor_puntaje = max(mejor_puntaje, puntaje) if es_maximizando else min(mejor_puntaje, puntaje)
+        return mejor_puntaje
+
+    def minimax_ab(self, profundidad, es_maximizando, alpha, beta, contador):
+        estadisticas = self.estadisticas
+        captura = self.captura_arbol
+        if estadisticas is not None:
+            estadisticas.nodo(profundidad)
+        valor = self.valor_hoja(profundidad, contador)
+        if valor is not None:
+            if captura is not None:
+                captura.marcar("hoja")
+            return valor
+        restante = self.profundidad_limite - profundidad - 1
+
+        tabla = self.tabla_transposicion
+        movimiento_hash = None
+        if tabla is not None:
+            clave, simetria, movimiento_hash, alpha, beta, corte = self.sondear_tabla(
+                profundidad, es_maximizando, restante, alpha, beta, contador)
+            if corte is not None:
+                if estadisticas is not None:
+                    estadisticas.cortes_tt += 1
+                if captura is not None:
+                    captura.marcar("tt")
+                return corte
+            alpha_original, beta_original = alpha, beta
+
+        mejor_movimiento = None
+        movimientos = self.ordenar_movimientos(self.movimientos_disponibles(), profundidad, es_maximizando,
+                                               movimiento_hash)
         if es_maximizando:
             max_eval = float("-inf")
-            for movimiento in self.movimientos_disponibles():
-                self.tablero[movimiento] = self.jugador_ia
+            for indice, movimiento in enumerate(movimientos):
+                self.hacer_movimiento(movimiento, self.jugador_ia)
                 contador["evaluados"] += 1
+                if captura is not None:
+                    captura.entrar(movimiento, self.jugador_ia)
                 evaluacion = self.minimax_ab(profundidad + 1, False, alpha, beta, contador)
-                self.tablero[movimiento] = " "
-                max_eval = max(max_eval, evaluacion)
+                if captura is not None:
+                    captura.salir(evaluacion)
+                self.deshacer_movimiento(movimiento)
+                if evaluacion > max_eval:
+                    max_eval = evaluacion
+                    mejor_movimiento = movimiento
                 alpha = max(alpha, evaluacion)
                 if beta <= alpha:
                     contador["podados"] += 1
-                    self.podados_en_turno.append(movimiento)
+                    self.podados_en_turno.agregar(movimiento)
+                    if estadisticas is not None:
+                        estadisticas.corte(profundidad, indice)
+                    if captura is not None:
+                        captura.marcar("corte")
+                        captura.podar(movimientos[indice + 1:], self.jugador_ia)
+                    self.registrar_corte(movimiento, profundidad, True, restante)
                     break
-            return max_eval
+            resultado = max_eval
         else:
             min_eval = float("inf")
-            for movimiento in self.movimientos_disponibles():
-                self.tablero[movimiento] = self.jugador_humano
+            for indice, movimiento in enumerate(movimientos):
+                self.hacer_movimiento(movimiento, self.jugador_humano)
                 contador["evaluados"] += 1
+                if captura is not None:
+                    captura.entrar(movimiento, self.jugador_humano)
                 evaluacion = self.minimax_ab(profundidad + 1, True, alpha, beta, contador)
-                self.tablero[movimiento] = " "
-                min_eval = min(min_eval, evaluacion)
+                if captura is not None:
+                    captura.salir(evaluacion)
+                self.deshacer_movimiento(movimiento)
+                if evaluacion < min_eval:
+                    min_eval = evaluacion
+                    mejor_movimiento = movimiento
                 beta = min(beta, evaluacion)
                 if beta <= alpha:
                     contador["podados"] += 1
-                    self.podados_en_turno.append(movimiento)
+                    self.podados_en_turno.agregar(movimiento)
+                    if estadisticas is not None:
+                        estadisticas.corte(profundidad, indice)
+                    if captura is not None:
+                        captura.marcar("corte")
+                        captura.podar(movimientos[indice + 1:], self.jugador_humano)
+                    self.registrar_corte(movimiento, profundidad, False, restante)
                     break
-            return min_eval
+            resultado = min_eval
+
+        if tabla is not None:
+            self.guardar_en_tabla(clave, simetria, profundidad, restante, resultado, alpha_original, beta_original,
+                                  mejor_movimiento, contador)
+        return resultado
 
-    def obtener_mejor_movimiento(self):
-        mejor_puntaje = float("-inf")
+    def negamax_ab(self, profundidad, es_maximizando, alpha, beta, contador, pvs=False):
+        # Alfa-beta fail-soft en forma negamax: el valor es para el jugador que mueve.
+        # Con pvs=True, tras la primera jugada se prueba con ventana nula y solo se repite si falla alto.
+        signo = 1 if es_maximizando else -1
+        estadisticas = self.estadisticas
+        captura = self.captura_arbol
+        if estadisticas is not None:
+            estadisticas.nodo(profundidad)
+        valor = self.valor_hoja(profundidad, contador)
+        if valor is not None:
+            if captura is not None:
+                captura.marcar("hoja")
+            return signo * valor
+        restante = self.profundidad_limite - profundidad - 1
+
+        tabla = self.tabla_transposicion
+        movimiento_hash = None
+        if tabla is not None:
+            clave, simetria, movimiento_hash, alpha, beta, corte = self.sondear_tabla(
+                profundidad, es_maximizando, restante, alpha, beta, contador, signo)
+            if corte is not None:
+                if estadisticas is not None:
+                    estadisticas.cortes_tt += 1
+                if captura is not None:
+                    captura.marcar("tt")
+                return corte
+            alpha_original, beta_original = alpha, beta
+
+        jugador = self.jugador_ia if es_maximizando else self.jugador_humano
+        mejor_valor = float("-inf")
         mejor_movimiento = None
-        mejor_f_valor = None
-        mejor_lineas_ia = None
-        mejor_lineas_humano = None
+        movimientos = self.ordenar_movimientos(self.movimientos_disponibles(), profundidad, es_maximizando,
+                                               movimiento_hash)
+        for indice, movimiento in enumerate(movimientos):
+            self.hacer_movimiento(movimiento, jugador)
+            contador["evaluados"] += 1
+            if captura is not None:
+                captura.entrar(movimiento, jugador)
+            if pvs and indice > 0:
+                evaluacion = -self.negamax_ab(profundidad + 1, not es_maximizando, -alpha - 1, -alpha, contador, pvs)
+                if alpha < evaluacion < beta:
+                    contador["re_busquedas"] += 1
+                    evaluacion = -self.negamax_ab(profundidad + 1, not es_maximizando, -beta, -alpha, contador, pvs)
+            else:
+                evaluacion = -self.negamax_ab(profundidad + 1, not es_maximizando, -beta, -alpha, contador, pvs)
+            if captura is not None:
+                # El árbol guarda los valores desde el punto de vista de la IA, como minimax_ab
+                captura.salir(signo * evaluacion)
+            self.deshacer_movimiento(movimiento)
+            if evaluacion > mejor_valor:
+                mejor_valor = evaluacion
+                mejor_movimiento = movimiento
+            alpha = max(alpha, evaluacion)
+            if alpha >= beta:
+                contador["podados"] += 1
+                self.podados_en_turno.agregar(movimiento)
+                if estadisticas is not None:
+                    estadisticas.corte(profundidad, indice)
+                if captura is not None:
+                    captura.marcar("corte")
+                    captura.podar(movimientos[indice + 1:], jugador)
+                self.registrar_corte(movimiento, profundidad, es_maximizando, restante)
+                break
+
+        if tabla is not None:
+            self.guardar_en_tabla(clave, simetria, profundidad, restante, mejor_valor, alpha_original, beta_original,
+                                  mejor_movimiento, contador, signo)
+        return mejor_valor
+
+    def mtdf(self, primera_estimacion, contador):
+        # MTD(f): converge al valor exacto con búsquedas de ventana nula sobre minimax_ab,
+        # apoyándose en la tabla de transposición para no repetir trabajo entre pasadas
+        g = primera_estimacion
+        cota_inferior, cota_superior = float("-inf"), float("inf")
+        while cota_inferior < cota_superior:
+            beta = g + 1 if g == cota_inferior else g
+            contador["re_busquedas"] += 1
+            g = self.minimax_ab(0, False, beta - 1, beta, contador)
+            if g < beta:
+                cota_superior = g
+            else:
+                cota_inferior = g
+        return g
+
+    def evaluar_jugada_raiz(self, estrategia, contador, alpha=float("-inf")):
+        # Valor (para la IA) del tablero tras la jugada de la raíz; mueve el humano.
+        # Es exacto si supera alpha; si no, es una cota superior
+        if estrategia == "minimax":
+            return self.minimax(0, False, contador)
+        if estrategia == "alfabeta":
+            return self.minimax_ab(0, False, alpha, float("inf"), contador)
+        if estrategia == "negamax":
+            return -self.negamax_ab(0, False, float("-inf"), -alpha, contador)
+        if estrategia == "pvs":
+            return -self.negamax_ab(0, False, float("-inf"), -alpha, contador, pvs=True)
+        # En el tres en raya la mayoría de posiciones son tablas: 0 es una buena primera estimación
+        return self.mtdf(0, contador)
+
+    def movimiento_de_libro(self):
+        consulta = self.libro.consultar(self.tablero, self.jugador_ia)
+        if consulta is None:
+            return None
+        valor, movimiento = consulta
+        self.tablero[movimiento] = self.jugador_ia
+        f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+        self.tablero[movimiento] = " "
+        self.historial_jugadas.append(("IA", movimiento, f"f(v)={f_valor}", []))
+
+        if not self.silencioso:
+            print(f"\n[IA consulta el libro: valor minimax {valor}]")
+            print(f"IA elige la posición {movimiento} con heurística: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+        return movimiento
+
+    def ordenar_raiz(self, primero=None):
+        movimientos = list(self.movimientos_disponibles())
+        if primero in movimientos:
+            # La mejor jugada de la iteración anterior va primero para poder usar resultados parciales
+            movimientos.remove(primero)
+            movimientos.insert(0, primero)
+        return movimientos
+
+    def elegir_raiz(self, evaluadas):
+        # evaluadas: [(movimiento, puntaje, f_valor, lineas_ia, lineas_humano)] en el orden de búsqueda.
+        # Devuelve (movimiento, puntaje, f_valor, lineas_ia, lineas_humano, alternativas)
+        mejor = None
         alternativas = []
+        for movimiento, puntaje, f_valor, lineas_ia, lineas_humano in evaluadas:
+            if mejor is None or puntaje > mejor[1]:
+                if mejor is not None:
+                    alternativas.append((mejor[0], mejor[2]))
+                mejor = (movimiento, puntaje, f_valor, lineas_ia, lineas_humano)
+            else:
+                alternativas.append((movimiento, f_valor))
+        return mejor + (alternativas,)
 
-        contador = {"evaluados": 0, "podados": 0}
-        self.podados_en_turno = []
+    def buscar_raiz(self, contador, primero=None, estrategia="alfabeta"):
+        # Una pasada completa sobre las jugadas de la raíz con el horizonte actual
+        evaluadas = []
+        for movimiento in self.ordenar_raiz(primero):
+            self.hacer_movimiento(movimiento, self.jugador_ia)
+            f_valor, lineas_ia, lineas_humano = self.heuristica_incremental()
+            inicio = time.perf_counter()
+            if self.captura_arbol is not None:
+                self.captura_arbol.entrar(movimiento, self.jugador_ia)
+            try:
+                puntaje = self.evaluar_jugada_raiz(estrategia, contador)
+            except BusquedaInterrumpida as interrupcion:
+                if evaluadas:
+                    interrupcion.parcial = self.elegir_raiz(evaluadas)
+                raise
+            finally:
+                if self.estadisticas is not None:
+                    self.estadisticas.raiz(movimiento, time.perf_counter() - inicio)
+            if self.captura_arbol is not None:
+                self.captura_arbol.salir(puntaje)
+            self.deshacer_movimiento(movimiento)
+            evaluadas.append((movimiento, puntaje, f_valor, lineas_ia, lineas_humano))
+        return self.elegir_raiz(evaluadas)
 
-        for movimiento in self.movimientos_disponibles():
+    def buscar_raiz_paralela(self, contador, primero=None, estrategia="alfabeta"):
+        # Cada jugada de la raíz se busca en un proceso del pool. Los trabajadores comparten
+        # la mejor puntuación de la raíz para podar los subárboles que se lanzan después.
+        ejecutor, mejor_compartido = self.obtener_ejecutor()
+        mejor_compartido.value = SIN_COTA
+        movimientos = self.ordenar_raiz(primero)
+        limite_nodos = None
+        if self.limite_nodos is not None:
+            limite_nodos = max(1, (self.limite_nodos - contador["evaluados"]) // len(movimientos))
+        tablero = list(self.tablero)
+        futuros = [ejecutor.submit(_buscar_jugada_raiz, tablero, movimiento, estrategia, self.ordenamiento,
+                                   self.profundidad_limite, self.fin_busqueda, limite_nodos,
+                                   self.estadisticas is not None)
+                   for movimiento in movimientos]
+
+        puntajes = {}
+        for futuro in futuros:
+            movimiento, puntaje, contador_trabajador, podados, estadisticas = futuro.result()
+            for clave, valor in contador_trabajador.items():
+                contador[clave] += valor
+            self.podados_en_turno.fusionar(podados)
+            if estadisticas is not None:
+                self.estadisticas.fusionar(estadisticas)
+            puntajes[movimiento] = puntaje
+
+        evaluadas = []
+        for movimiento in movimientos:
+            if puntajes[movimiento] is None:
+                continue
             self.tablero[movimiento] = self.jugador_ia
             f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
-            puntaje = self.minimax_ab(0, False, float("-inf"), float("inf"), contador)
             self.tablero[movimiento] = " "
-            if puntaje > mejor_puntaje:
-                if mejor_movimiento is not None:
-                    alternativas.append((mejor_movimiento, mejor_f_valor))
-                mejor_puntaje = puntaje
-                mejor_movimiento = movimiento
-                mejor_f_valor = f_valor
-                mejor_lineas_ia = lineas_ia
-                mejor_lineas_humano = lineas_humano
-            else:
-                alternativas.append((movimiento, f_valor))
+            evaluadas.append((movimiento, puntajes[movimiento], f_valor, lineas_ia, lineas_humano))
+        if len(evaluadas) < len(movimientos):
+            interrupcion = BusquedaInterrumpida()
+            if puntajes[movimientos[0]] is not None:
+                interrupcion.parcial = self.elegir_raiz(evaluadas)
+            raise interrupcion
+        return self.elegir_raiz(evaluadas)
+
+    def registrar_telemetria(self, contador, estrategia, procesos, profundidad_alcanzada, resultado, segundos):
+        registro = {"turno": len(self.historial_jugadas), "tablero": "".join(self.tablero), "estrategia": estrategia,
+                    "procesos": procesos, "movimiento": resultado[0], "puntaje": resultado[1],
+                    "profundidad_completada": profundidad_alcanzada, "segundos": round(segundos, 6),
+                    "podados_vistos": self.podados_en_turno.vistos, "podados_muestra": list(self.podados_en_turno)}
+        # Con procesos > 1 cada trabajador llena su propia tabla y la del motor no se usa
+        registro.update(self.estadisticas.resumen(contador, self.tabla_transposicion if procesos == 1 else None))
+        self.ultima_telemetria = registro
+        self.estadisticas = None
+        if self.ruta_telemetria is not None:
+            escribir_jsonl(self.ruta_telemetria, registro)
+
+    def configuracion_trabajador(self):
+        # Argumentos con los que cada proceso del pool crea su propio motor
+        return {"filas": self.filas, "columnas": self.columnas, "k": self.k,
+                "capacidad_tt": self.capacidad_tt, "politica_tt": self.politica_tt,
+                "usar_libro": False, "jugador_ia": self.jugador_ia,
+                "jugador_humano": self.jugador_humano, "silencioso": True}
+
+    def obtener_ejecutor(self):
+        if self.ejecutor is None:
+            contexto = multiprocessing.get_context()
+            mejor_compartido = contexto.Value("i", SIN_COTA)
+            configuracion = self.configuracion_trabajador()
+            self.ejecutor = ProcessPoolExecutor(self.procesos, mp_context=contexto, initializer=_iniciar_trabajador,
+                                                initargs=(type(self), configuracion, mejor_compartido))
+            self.mejor_compartido = mejor_compartido
+        return self.ejecutor, self.mejor_compartido
+
+    def cerrar(self):
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown()
+            self.ejecutor = None
+            self.mejor_compartido = None
+
+    def obtener_mejor_movimiento(self, tiempo_limite=None, limite_nodos=None, estrategia=None, procesos=None):
+        if self.libro is not None:
+            movimiento = self.movimiento_de_libro()
+            if movimiento is not None:
+                return movimiento
+
+        tiempo_limite = self.tiempo_por_jugada if tiempo_limite is None else tiempo_limite
+        limite_nodos = self.nodos_por_jugada if limite_nodos is None else limite_nodos
+        estrategia = self.estrategia if estrategia is None else estrategia
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia de búsqueda desconocida: {estrategia}")
+        contador = nuevo_contador()
+        self.podados_en_turno.limpiar()
+        self.estadisticas = EstadisticasBusqueda() if self.telemetria else None
+        inicio_turno = time.perf_counter()
+        # Las killer dependen de la profundidad relativa a la raíz; la historia se envejece a la mitad
+        self.killers = {}
+        for valores in self.historia.values():
+            valores[:] = [valor // 2 for valor in valores]
+
+        if tiempo_limite is None and limite_nodos is None:
+            # Sin presupuesto se busca hasta el final de la partida en una sola pasada
+            profundidades = [self.casillas]
+        else:
+            # Profundización iterativa: cada iteración termina o se interrumpe al agotar el presupuesto
+            profundidades = range(1, len(self.movimientos_disponibles()) + 1)
+
+        procesos = self.procesos if procesos is None else procesos
+        buscar = self.buscar_raiz_paralela if procesos > 1 else self.buscar_raiz
+        self.sincronizar()
+        # La búsqueda paralela no se captura: cada trabajador explora su propio subárbol
+        captura = self.captura_arbol if procesos == 1 else None
+        tablero_inicial = list(self.tablero)
+        resultado = None
+        profundidad_alcanzada = 0
+        self.iniciar_presupuesto(tiempo_limite, limite_nodos)
+        try:
+            for limite in profundidades:
+                self.profundidad_limite = limite
+                inicio_iteracion = time.perf_counter()
+                nodos_iteracion = contador["evaluados"]
+                if captura is not None:
+                    # Un árbol por iteración: cada una vuelve a recorrer el árbol desde la raíz
+                    captura.iniciar(self.tablero, self.jugador_ia, limite, self.jugador_humano)
+                try:
+                    resultado = buscar(contador, resultado[0] if resultado else None, estrategia)
+                except BusquedaInterrumpida as interrupcion:
+                    if captura is not None:
+                        captura.terminar(None)
+                    self.tablero[:] = tablero_inicial
+                    self.sincronizar()
+                    if interrupcion.parcial is not None:
+                        resultado = interrupcion.parcial
+                    break
+                profundidad_alcanzada = limite
+                if captura is not None:
+                    captura.terminar(resultado[1])
+                if self.estadisticas is not None:
+                    self.estadisticas.iteraciones.append(
+                        (limite, contador["evaluados"] - nodos_iteracion, time.perf_counter() - inicio_iteracion))
+                if abs(resultado[1]) > len(self.lineas):
+                    break  # victoria o derrota demostrada: más profundidad no cambia la jugada
+        finally:
+            self.iniciar_presupuesto(None, None)
+            self.profundidad_limite = self.casillas
+
+        if resultado is None:
+            # Ni la primera iteración terminó una jugada: se juega la primera casilla libre
+            movimiento = self.movimientos_disponibles()[0]
+            self.tablero[movimiento] = self.jugador_ia
+            f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+            self.tablero[movimiento] = " "
+            resultado = (movimiento, None, f_valor, lineas_ia, lineas_humano, [])
+        mejor_movimiento, _, mejor_f_valor, mejor_lineas_ia, mejor_lineas_humano, alternativas = resultado
 
         alt_textos = [f"Pos {mov}: f(v)={v}" for mov, v in alternativas]
         podados_textos = [f"Pos {mov}: PODADO" for mov in self.podados_en_turno]
         self.historial_jugadas.append(("IA", mejor_movimiento, f"f(v)={mejor_f_valor}", alt_textos + podados_textos))
+        if self.estadisticas is not None:
+            self.registrar_telemetria(contador, estrategia, procesos, profundidad_alcanzada, resultado,
+                                      time.perf_counter() - inicio_turno)
+
+        if self.silencioso:
+            return mejor_movimiento
 
         print(f"\n[Resumen poda alfa-beta]")
+        print(f"Estrategia: {estrategia}" + (f" ({procesos} procesos)" if procesos > 1 else ""))
         print(f"Nodos evaluados: {contador['evaluados']}")
         print(f"Ramas podadas: {contador['podados']}")
+        if contador["re_busquedas"]:
+            print(f"Re-búsquedas: {contador['re_busquedas']}")
+        if len(profundidades) > 1:
+            print(f"Profundidad completada: {profundidad_alcanzada}")
+        if self.tabla_transposicion is not None:
+            consultas = max(contador["tt_aciertos"] + contador["tt_fallos"], 1)
+            print(f"TT aciertos: {contador['tt_aciertos']} ({100 * contador['tt_aciertos'] / consultas:.1f}%)")
+            print(f"TT fallos: {contador['tt_fallos']} ({100 * contador['tt_fallos'] / consultas:.1f}%)")
+            print(f"TT guardados: {contador['tt_guardados']} ({100 * contador['tt_guardados'] / consultas:.1f}%)")
+            if procesos == 1:
+                print(f"TT entradas: {len(self.tabla_transposicion)}/{self.tabla_transposicion.capacidad}")
         print(f"IA elige la posición {mejor_movimiento} con heurística: f(v) = {mejor_lineas_ia} - {mejor_lineas_humano} = {mejor_f_valor}")
         return mejor_movimiento
 
@@ -146,37 +806,47 @@ class TresEnRaya:
         print("¡Bienvenido al Tres en Raya!")
         print("Eres 'O' y el agente es 'X'")
         print("Tablero por posiciones:")
-        print("0 | 1 | 2")
-        print("---------")
-        print("3 | 4 | 5")
-        print("---------")
-        print("6 | 7 | 8\n")
+        ancho = len(str(self.casillas - 1))
+        for i in range(0, self.casillas, self.columnas):
+            print(" | ".join(str(pos).rjust(ancho) for pos in range(i, i + self.columnas)))
+            if i < self.casillas - self.columnas:
+                print("-" * ((ancho + 3) * self.columnas - 3))
+        print()
 
         turno_ia = random.choice([True, False])
+        centro = casilla_central(self.filas, self.columnas)
+        ultima = self.casillas - 1
+        ponderador = Ponderador(self) if self.ponderar else None
 
         while not self.juego_terminado():
             if turno_ia:
                 print("\nTurno de la IA...")
-                if self.tablero == [" " for _ in range(9)]:
-                    movimiento = 4
-                    print("[IA juega su apertura en el centro (posición 4)]")
-                    self.historial_jugadas.append(("IA", 4, "f(v)=N/A", []))
+                if self.tablero == [" " for _ in range(self.casillas)]:
+                    movimiento = centro
+                    print(f"[IA juega su apertura en el centro (posición {centro})]")
+                    self.historial_jugadas.append(("IA", centro, "f(v)=N/A", []))
                 else:
-                    movimiento = self.obtener_mejor_movimiento()
+                    movimiento = ponderador.recoger() if ponderador is not None else None
+                    if movimiento is None:
+                        movimiento = self.obtener_mejor_movimiento()
                 self.realizar_movimiento(movimiento, self.jugador_ia)
             else:
+                if ponderador is not None:
+                    ponderador.iniciar()
                 while True:
                     try:
-                        movimiento = int(input("\nTu turno (0-8): "))
-                        if 0 <= movimiento <= 8 and self.realizar_movimiento(movimiento, self.jugador_humano):
+                        movimiento = int(input(f"\nTu turno (0-{ultima}): "))
+                        if 0 <= movimiento <= ultima and self.realizar_movimiento(movimiento, self.jugador_humano):
                             f_valor, _, _ = self.evaluar_heuristica()
                             self.historial_jugadas.append(("Humano", movimiento, f"f(v)={f_valor}", []))
                             break
                         else:
                             print("¡Movimiento inválido! Intenta de nuevo.")
                     except ValueError:
-                        print("Por favor, ingresa un número entre 0 y 8.")
+                        print(f"Por favor, ingresa un número entre 0 y {ultima}.")
             turno_ia = not turno_ia
+        if ponderador is not None:
+            ponderador.detener()
 
         self.imprimir_tablero()
         ganador = self.verificar_ganador()
@@ -186,7 +856,66 @@ class TresEnRaya:
             print("\nFelicidades, ganaste!!!")
         else:
             print("\nEs un empate!")
-            
+
+
+# Estado de cada proceso trabajador de la búsqueda paralela
+_motor_trabajador = None
+_mejor_compartido = None
+
+
+def _iniciar_trabajador(clase, configuracion, mejor_compartido):
+    global _motor_trabajador, _mejor_compartido
+    _motor_trabajador = clase(**configuracion)
+    _mejor_compartido = mejor_compartido
+
+
+def _llamar_trabajador(metodo, *argumentos):
+    # Ejecuta un método del motor del trabajador: lo usan los motores derivados (mcts.py)
+    return getattr(_motor_trabajador, metodo)(*argumentos)
+
+
+def _buscar_jugada_raiz(tablero, movimiento, estrategia, ordenamiento, profundidad_limite, fin_busqueda,
+                        limite_nodos, telemetria=False):
+    # fin_busqueda es un instante de time.perf_counter(), que usa el reloj monotónico del sistema
+    motor = _motor_trabajador
+    motor.tablero[:] = tablero
+    motor.ordenamiento = ordenamiento
+    motor.killers = {}
+    motor.podados_en_turno.limpiar()
+    motor.estadisticas = EstadisticasBusqueda() if telemetria else None
+    motor.profundidad_limite = profundidad_limite
+    motor.fin_busqueda = fin_busqueda
+    motor.limite_nodos = limite_nodos
+    motor.sincronizar()
+    contador = nuevo_contador()
+    # Con alpha = mejor - 1 las jugadas que empatan con la mejor siguen dando su valor exacto
+    mejor = _mejor_compartido.value
+    alpha = mejor - 1 if mejor != SIN_COTA else float("-inf")
+    motor.hacer_movimiento(movimiento, motor.jugador_ia)
+    inicio = time.perf_counter()
+    try:
+        puntaje = motor.evaluar_jugada_raiz(estrategia, contador, alpha)
+    except BusquedaInterrumpida:
+        puntaje = None
+    finally:
+        if motor.estadisticas is not None:
+            motor.estadisticas.raiz(movimiento, time.perf_counter() - inicio)
+        motor.tablero[:] = tablero
+        motor.sincronizar()
+        motor.iniciar_presupuesto(None, None)
+    if puntaje is not None:
+        with _mejor_compartido.get_lock():
+            if puntaje > _mejor_compartido.value:
+                _mejor_compartido.value = puntaje
+    estadisticas, motor.estadisticas = motor.estadisticas, None
+    return movimiento, puntaje, contador, motor.podados_en_turno, estadisticas
+
+
+class TresEnRayaBits(MotorBits, TresEnRaya):
+    # Misma API que TresEnRaya, con el tablero representado como bitboards
+    pass
+
+
 if __name__ == "__main__":
     juego = TresEnRaya()
     juego.jugar()
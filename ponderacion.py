@@ -0,0 +1,117 @@
+import threading
+from collections import deque
+
+from telemetria import escribir_jsonl
+
+
+class Ponderador:
+    # Piensa en el turno del humano: mientras espera su jugada, un hilo busca la respuesta de la IA
+    # a cada jugada probable del humano y la deja en una caché. input() suelta el GIL, así que el
+    # hilo tiene la CPU para él solo. Cuando llega la jugada real se reutiliza su resultado y se
+    # cancela el resto; si aún no se había buscado, la IA busca como siempre
+    def __init__(self, motor, max_respuestas=None):
+        self.motor = motor
+        self.max_respuestas = max_respuestas
+        # Motor propio (con su tabla de transposición): el del juego cambia mientras el hilo busca
+        self.pensador = type(motor)(motor.filas, motor.columnas, motor.k, capacidad_tt=motor.capacidad_tt,
+                                    politica_tt=motor.politica_tt, usar_libro=motor.libro is not None,
+                                    tiempo_por_jugada=motor.tiempo_por_jugada, nodos_por_jugada=motor.nodos_por_jugada,
+                                    ordenamiento=motor.ordenamiento, estrategia=motor.estrategia, procesos=1,
+                                    jugador_ia=motor.jugador_ia, jugador_humano=motor.jugador_humano,
+                                    silencioso=True, telemetria=motor.telemetria)
+        self.cancelado = threading.Event()
+        self.pensador.cancelacion = self.cancelado
+        self.cerrojo = threading.Lock()
+        self.cache = {}  # tablero tras la jugada del humano -> (movimiento, historial, telemetría)
+        self.pendientes = deque()
+        self.en_curso = None
+        self.hilo = None
+        self.aciertos = 0
+        self.fallos = 0
+
+    def respuestas_probables(self, tablero):
+        # Jugadas del humano de la mejor a la peor para él según la heurística: f(v) más bajo primero
+        motor = self.pensador
+        respuestas = []
+        for movimiento in [i for i, casilla in enumerate(tablero) if casilla == " "]:
+            motor.tablero[:] = tablero
+            motor.tablero[movimiento] = motor.jugador_humano
+            if motor.juego_terminado():
+                continue
+            respuestas.append((motor.evaluar_heuristica()[0], movimiento))
+        motor.tablero[:] = tablero
+        respuestas.sort()
+        return [movimiento for _, movimiento in respuestas[:self.max_respuestas]]
+
+    def iniciar(self):
+        # Se llama cuando le toca al humano, con el tablero del motor en la posición actual
+        self.detener()
+        tablero = list(self.motor.tablero)
+        self.cache.clear()
+        self.cancelado.clear()
+        self.pendientes = deque(self.respuestas_probables(tablero))
+        self.hilo = threading.Thread(target=self._pensar, args=(tablero, list(self.motor.historial_jugadas)),
+                                     daemon=True)
+        self.hilo.start()
+
+    def _pensar(self, tablero, historial):
+        motor = self.pensador
+        while True:
+            with self.cerrojo:
+                if not self.pendientes or self.cancelado.is_set():
+                    self.en_curso = None
+                    return
+                respuesta = self.pendientes.popleft()
+                motor.tablero[:] = tablero
+                motor.tablero[respuesta] = motor.jugador_humano
+                clave = tuple(motor.tablero)
+                self.en_curso = clave
+            motor.sincronizar()
+            # Mismo historial que tendrá el motor del juego, para que la telemetría numere bien el turno
+            motor.historial_jugadas = historial + [("Humano", respuesta, None, [])]
+            motor.ultima_telemetria = None
+            # Mismo presupuesto que el motor del juego; la búsqueda consulta la cancelación aunque no tenga plazo
+            movimiento = motor.obtener_mejor_movimiento()
+            with self.cerrojo:
+                # Una búsqueda cancelada devuelve un resultado parcial que no se guarda
+                if not self.cancelado.is_set():
+                    self.cache[clave] = (movimiento, motor.historial_jugadas[len(historial) + 1:],
+                                         motor.ultima_telemetria)
+
+    def recoger(self):
+        # Se llama tras la jugada del humano. Devuelve la jugada de la IA si ya estaba pensada
+        # (esperando a que termine si es justo la que se estaba buscando) o None
+        clave = tuple(self.motor.tablero)
+        with self.cerrojo:
+            self.pendientes.clear()
+            if self.en_curso != clave:
+                self.cancelado.set()
+        if self.hilo is not None:
+            self.hilo.join()
+            self.hilo = None
+        resultado = self.cache.pop(clave, None)
+        self.cache.clear()
+        if resultado is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        movimiento, historial, telemetria = resultado
+        motor = self.motor
+        motor.historial_jugadas.extend(historial)
+        if telemetria is not None:
+            motor.ultima_telemetria = telemetria
+            if motor.ruta_telemetria is not None:
+                escribir_jsonl(motor.ruta_telemetria, telemetria)
+        if not motor.silencioso:
+            print(f"\n[IA ya había pensado esta jugada durante tu turno: posición {movimiento}]")
+        return movimiento
+
+    def detener(self):
+        # Cancela todo lo pendiente (también al acabar la partida)
+        if self.hilo is not None:
+            with self.cerrojo:
+                self.pendientes.clear()
+                if self.en_curso is not None:
+                    self.cancelado.set()
+            self.hilo.join()
+            self.hilo = None
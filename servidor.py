@@ -0,0 +1,325 @@
+import argparse
+import asyncio
+import json
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from geometria import generar_lineas, generar_simetrias
+from poda_AB import TresEnRaya
+from telemetria import MuestreoAcotado, percentil
+from transposicion import TablaTransposicion
+
+# Servidor de partidas: una línea JSON por petición y otra por respuesta, sobre TCP o un socket Unix.
+#   {"op": "nueva", "filas": 3, "columnas": 3, "k": 3, "empieza": "humano" | "ia"}
+#   {"op": "mover", "sesion": 7, "posicion": 4}
+#   {"op": "cerrar", "sesion": 7}
+#   {"op": "estadisticas"}
+# Las respuestas con jugada de la IA incluyen "ia" (su casilla), "tablero", "ganador" y "terminada".
+# Todas las sesiones comparten una caché LRU de posiciones resueltas (en forma canónica bajo
+# las simetrías); lo que no está en la caché se busca en un pool de procesos
+FICHA_IA = "X"
+FICHA_HUMANO = "O"
+MAX_CASILLAS = 64
+LIMITE_LINEA = 1 << 16  # bytes por petición
+
+
+@lru_cache(maxsize=None)
+def geometria(filas, columnas, k):
+    return generar_lineas(filas, columnas, k), generar_simetrias(filas, columnas)
+
+
+class Sesion:
+    # Lo único que guarda el servidor por partida: el tablero y sus dimensiones
+    __slots__ = ("filas", "columnas", "k", "tablero")
+
+    def __init__(self, filas=3, columnas=3, k=3):
+        self.filas = filas
+        self.columnas = columnas
+        self.k = k
+        self.tablero = [" "] * (filas * columnas)
+
+    def ganador(self):
+        for linea in geometria(self.filas, self.columnas, self.k)[0]:
+            primera = self.tablero[linea[0]]
+            if primera != " " and all(self.tablero[pos] == primera for pos in linea):
+                return primera
+        return None
+
+    def terminada(self):
+        return self.ganador() is not None or " " not in self.tablero
+
+    def mover(self, posicion, ficha):
+        if self.terminada():
+            raise ValueError("La partida ya ha terminado")
+        # bool es subclase de int: true no es la casilla 1
+        if (not isinstance(posicion, int) or isinstance(posicion, bool) or not 0 <= posicion < len(self.tablero)
+                or self.tablero[posicion] != " "):
+            raise ValueError(f"Movimiento inválido: {posicion}")
+        self.tablero[posicion] = ficha
+
+    def estado(self):
+        return {"tablero": "".join(self.tablero), "ganador": self.ganador(), "terminada": self.terminada()}
+
+
+def clave_canonica(sesion):
+    # (clave, simetría): el menor de los tableros equivalentes; simetria[j] es la casilla real de la posición j
+    _, simetrias = geometria(sesion.filas, sesion.columnas, sesion.k)
+    mejor = None
+    mejor_simetria = None
+    for simetria in simetrias:
+        texto = "".join([sesion.tablero[i] for i in simetria])
+        if mejor is None or texto < mejor:
+            mejor, mejor_simetria = texto, simetria
+    return (sesion.filas, sesion.columnas, sesion.k, mejor), mejor_simetria
+
+
+# Motores de cada proceso del pool, uno por tamaño de tablero; conservan su tabla de transposición
+_motores = {}
+
+
+def _resolver(filas, columnas, k, tablero, tiempo):
+    motor = _motores.get((filas, columnas, k))
+    if motor is None:
+        motor = TresEnRaya(filas, columnas, k, jugador_ia=FICHA_IA, jugador_humano=FICHA_HUMANO, silencioso=True,
+                           tiempo_por_jugada=None if (filas, columnas, k) == (3, 3, 3) else tiempo)
+        _motores[(filas, columnas, k)] = motor
+    motor.tablero[:] = tablero
+    movimiento = motor.obtener_mejor_movimiento()
+    # El motor vive todo lo que el servidor: su historial no puede crecer con cada petición
+    motor.historial_jugadas.clear()
+    return movimiento
+
+
+class ServidorJuego:
+    def __init__(self, capacidad_cache=100000, procesos=None, tiempo=0.2, max_sesiones=100000, muestras=10000):
+        self.sesiones = {}
+        self.siguiente_sesion = 1
+        self.max_sesiones = max_sesiones
+        self.cache = TablaTransposicion(capacidad_cache, "lru")  # clave canónica -> (jugada canónica,)
+        self.en_curso = {}  # clave canónica -> futuro de la búsqueda que ya la está resolviendo
+        self.ejecutor = ProcessPoolExecutor(procesos)
+        self.tiempo = tiempo
+        self.inicio = time.perf_counter()
+        self.peticiones = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.compartidas = 0  # fallos que esperaron la búsqueda ya lanzada por otra sesión
+        self.latencias = MuestreoAcotado(muestras)
+        # Ventana del último informe periódico
+        self.inicio_ventana = self.inicio
+        self.peticiones_ventana = 0
+        self.latencias_ventana = MuestreoAcotado(muestras)
+
+    def cerrar(self):
+        self.ejecutor.shutdown(cancel_futures=True)
+
+    def _guardar(self, clave, futuro):
+        del self.en_curso[clave]
+        if not futuro.cancelled() and futuro.exception() is None:
+            self.cache.guardar(clave, (futuro.result(),))
+
+    async def jugada_ia(self, sesion):
+        clave, simetria = clave_canonica(sesion)
+        entrada = self.cache.buscar(clave)
+        if entrada is not None:
+            self.aciertos += 1
+            canonica = entrada[0]
+        else:
+            self.fallos += 1
+            # Si otra sesión ya espera esta misma posición se comparte su búsqueda
+            futuro = self.en_curso.get(clave)
+            if futuro is not None:
+                self.compartidas += 1
+            else:
+                futuro = asyncio.get_running_loop().run_in_executor(
+                    self.ejecutor, _resolver, sesion.filas, sesion.columnas, sesion.k, list(clave[3]), self.tiempo)
+                self.en_curso[clave] = futuro
+                futuro.add_done_callback(lambda terminado: self._guardar(clave, terminado))
+            # shield: si se cae una conexión, la búsqueda sigue para las demás sesiones que la esperan
+            canonica = await asyncio.shield(futuro)
+        movimiento = simetria[canonica]
+        sesion.mover(movimiento, FICHA_IA)
+        return movimiento
+
+    def sesion(self, peticion, propias):
+        # Solo la conexión que abrió una sesión puede jugar en ella o cerrarla: los ids son consecutivos
+        identificador = peticion.get("sesion")
+        if identificador not in propias or identificador not in self.sesiones:
+            raise ValueError(f"Sesión desconocida: {identificador}")
+        return self.sesiones[identificador]
+
+    async def procesar(self, peticion, propias):
+        operacion = peticion.get("op")
+        if operacion == "nueva":
+            filas, columnas, k = (int(peticion.get(clave, 3)) for clave in ("filas", "columnas", "k"))
+            if not (1 <= k <= max(filas, columnas) and 0 < filas * columnas <= MAX_CASILLAS):
+                raise ValueError(f"Tablero no admitido: {filas}x{columnas} con k={k}")
+            if len(self.sesiones) >= self.max_sesiones:
+                raise ValueError("Demasiadas sesiones abiertas")
+            identificador = self.siguiente_sesion
+            self.siguiente_sesion += 1
+            sesion = Sesion(filas, columnas, k)
+            self.sesiones[identificador] = sesion
+            propias.add(identificador)
+            try:
+                movimiento = await self.jugada_ia(sesion) if peticion.get("empieza") == "ia" else None
+            except Exception:
+                # Si la búsqueda falla la sesión no llega a abrirse y no ocupa un hueco de max_sesiones
+                del self.sesiones[identificador]
+                propias.discard(identificador)
+                raise
+            return {"sesion": identificador, "ia": movimiento, **sesion.estado()}
+        if operacion == "mover":
+            sesion = self.sesion(peticion, propias)
+            posicion = peticion.get("posicion")
+            sesion.mover(posicion, FICHA_HUMANO)
+            try:
+                movimiento = None if sesion.terminada() else await self.jugada_ia(sesion)
+            except Exception:
+                # Si la búsqueda falla la jugada del humano no cuenta: puede repetir la petición
+                sesion.tablero[posicion] = " "
+                raise
+            return {"sesion": peticion["sesion"], "ia": movimiento, **sesion.estado()}
+        if operacion == "cerrar":
+            self.sesion(peticion, propias)
+            del self.sesiones[peticion["sesion"]]
+            propias.discard(peticion["sesion"])
+            return {"sesion": peticion["sesion"], "cerrada": True}
+        if operacion == "estadisticas":
+            return self.resumen()
+        raise ValueError(f"Operación desconocida: {operacion}")
+
+    async def atender(self, lector, escritor):
+        # Una conexión puede llevar varias sesiones; al cerrarse se liberan las que abrió
+        propias = set()
+        try:
+            while True:
+                inicio = time.perf_counter()
+                try:
+                    linea = await leer_linea(lector)
+                    if not linea:
+                        break
+                    inicio = time.perf_counter()
+                    peticion = json.loads(linea)
+                    respuesta = await self.procesar(peticion, propias)
+                except ConnectionError:
+                    raise
+                except Exception as error:
+                    # Peticiones mal formadas y fallos del pool (BrokenProcessPool, errores de _resolver):
+                    # se responde con el error y la conexión sigue abierta
+                    respuesta = {"error": str(error) or type(error).__name__}
+                escritor.write(json.dumps(respuesta).encode() + b"\n")
+                await escritor.drain()
+                self.peticiones += 1
+                self.peticiones_ventana += 1
+                if respuesta.get("ia") is not None:
+                    latencia = time.perf_counter() - inicio
+                    self.latencias.agregar(latencia)
+                    self.latencias_ventana.agregar(latencia)
+        except ConnectionError:
+            pass
+        finally:
+            for identificador in propias:
+                self.sesiones.pop(identificador, None)
+            escritor.close()
+
+    def resumen(self):
+        segundos = time.perf_counter() - self.inicio
+        consultas = self.aciertos + self.fallos
+        latencias = list(self.latencias)
+        return {"sesiones": len(self.sesiones), "peticiones": self.peticiones,
+                "peticiones_por_segundo": round(self.peticiones / segundos, 1) if segundos else None,
+                "latencia_p50_ms": _milisegundos(percentil(latencias, 50)),
+                "latencia_p99_ms": _milisegundos(percentil(latencias, 99)),
+                "cache_entradas": len(self.cache), "cache_desalojos": self.cache.desalojos,
+                "cache_aciertos": round(100 * self.aciertos / consultas, 1) if consultas else None,
+                "busquedas": self.fallos - self.compartidas, "busquedas_compartidas": self.compartidas}
+
+    async def informar(self, intervalo):
+        # Informe periódico de la última ventana: peticiones por segundo y latencias de las jugadas
+        while True:
+            await asyncio.sleep(intervalo)
+            if not self.peticiones_ventana:
+                continue
+            ahora = time.perf_counter()
+            latencias = list(self.latencias_ventana)
+            consultas = self.aciertos + self.fallos
+            texto_cache = f"{100 * self.aciertos / consultas:.1f}% aciertos" if consultas else "sin consultas"
+            print(f"{len(self.sesiones)} sesiones | {self.peticiones_ventana / (ahora - self.inicio_ventana):,.1f} pet/s"
+                  f" | jugada p50 {_milisegundos(percentil(latencias, 50))} ms"
+                  f" p99 {_milisegundos(percentil(latencias, 99))} ms"
+                  f" | caché {len(self.cache)} posiciones, {texto_cache}", flush=True)
+            self.inicio_ventana = ahora
+            self.peticiones_ventana = 0
+            self.latencias_ventana.limpiar()
+
+
+async def leer_linea(lector):
+    # Como readline, pero una línea más larga que el límite del lector se descarta entera (no solo
+    # su principio, que dejaría el resto como una petición más) y se señala con ValueError
+    try:
+        return await lector.readuntil(b"\n")
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+    except asyncio.LimitOverrunError as error:
+        consumidos = error.consumed
+    while True:
+        await lector.readexactly(consumidos)
+        try:
+            await lector.readuntil(b"\n")
+            break
+        except asyncio.IncompleteReadError:
+            return b""
+        except asyncio.LimitOverrunError as error:
+            consumidos = error.consumed
+    raise ValueError(f"Petición más larga que el límite de {LIMITE_LINEA} bytes")
+
+
+def _milisegundos(segundos):
+    return None if segundos is None else round(1000 * segundos, 3)
+
+
+async def servir(servidor, host="127.0.0.1", puerto=8765, unix=None, intervalo=5.0):
+    if unix is not None:
+        red = await asyncio.start_unix_server(servidor.atender, unix, limit=LIMITE_LINEA)
+        print(f"Servidor escuchando en {unix}", flush=True)
+    else:
+        red = await asyncio.start_server(servidor.atender, host, puerto, limit=LIMITE_LINEA, backlog=4096)
+        print(f"Servidor escuchando en {host}:{puerto}", flush=True)
+    informe = asyncio.create_task(servidor.informar(intervalo)) if intervalo > 0 else None
+    try:
+        # SIGTERM para el servidor de forma ordenada, igual que Ctrl+C
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except NotImplementedError:
+        pass
+    try:
+        async with red:
+            await red.serve_forever()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        if informe is not None:
+            informe.cancel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de partidas de tres en raya para muchas sesiones a la vez")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--unix", help="ruta de un socket Unix (en lugar de TCP)")
+    parser.add_argument("--procesos", type=int, default=None, help="procesos del pool de búsqueda")
+    parser.add_argument("--capacidad-cache", type=int, default=100000, help="posiciones resueltas en la caché LRU")
+    parser.add_argument("--tiempo", type=float, default=0.2, help="segundos por búsqueda fuera del 3x3")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="segundos entre informes (0 los desactiva)")
+    args = parser.parse_args()
+
+    servidor = ServidorJuego(args.capacidad_cache, args.procesos, args.tiempo)
+    try:
+        asyncio.run(servir(servidor, args.host, args.puerto, args.unix, args.intervalo))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(servidor.resumen(), ensure_ascii=False))
+        servidor.cerrar()
@@ -0,0 +1,163 @@
+import mmap
+import struct
+import sys
+from array import array
+from collections import deque
+
+from anchura_misioneros import State, boat_loads, build_path, neighbors, print_solution
+
+## Distance-to-goal table for every (cannibalLeft, missionaryLeft, boat) state of one instance,
+## filled once by a backward BFS from the goal states. State index, as in misioneros_vectorizado:
+## (boat * (cannibals + 1) + cannibalLeft) * (missionaries + 1) + missionaryLeft, boat 0 = left.
+## File layout: MAGIC, missionaries, cannibals, capacity (uint32), then the uint32 distances
+## and one uint16 per state with the index of the optimal load in boat_loads(capacity), which
+## has over 255 loads from capacity 22 on. Every integer is little-endian; array("I") and
+## array("H") are native, so big-endian hosts byteswap them.
+MAGIC = b"MYC2"
+HEADER = struct.Struct("<4sIII")
+UNREACHABLE = 0xFFFFFFFF
+NO_MOVE = 0xFFFF
+
+
+class DistanceTable:
+    def __init__(self, missionaries, cannibals, capacity, distances, moves, data=None):
+        self.missionaries = missionaries
+        self.cannibals = cannibals
+        self.capacity = capacity
+        self.loads = boat_loads(capacity)
+        self.distances = distances
+        self.moves = moves
+        self.data = data  ## mmap backing the arrays when the table was loaded from disk
+
+    def key_index(self, cannibalLeft, missionaryLeft, boatLeft):
+        return ((0 if boatLeft else 1) * (self.cannibals + 1) + cannibalLeft) * (self.missionaries + 1) + missionaryLeft
+
+    def index(self, state):
+        if not (0 <= state.cannibalLeft <= self.cannibals and 0 <= state.missionaryLeft <= self.missionaries):
+            raise ValueError("State outside the %d missionaries / %d cannibals instance"
+                             % (self.missionaries, self.cannibals))
+        return self.key_index(state.cannibalLeft, state.missionaryLeft, state.boat == 'left')
+
+    def distance(self, state):
+        ## Crossings left on an optimal plan, or None if the goal cannot be reached from `state`
+        distance = self.distances[self.index(state)]
+        return None if distance == UNREACHABLE else distance
+
+    def next_move(self, state):
+        ## (missionaries, cannibals) carried by the next optimal crossing, or None at the goal
+        move = self.moves[self.index(state)]
+        return None if move == NO_MOVE else self.loads[move]
+
+    def path(self, state):
+        ## Optimal plan from `state` by walking the table; same format as breadth_first_search
+        if self.distance(state) is None:
+            return None
+        key = (state.cannibalLeft, state.missionaryLeft, state.boat == 'left')
+        parents = {key: None}
+        move = self.moves[self.key_index(*key)]
+        while move != NO_MOVE:
+            movedMissionaries, movedCannibals = self.loads[move]
+            direction = -1 if key[2] else 1
+            child = (key[0] + direction * movedCannibals, key[1] + direction * movedMissionaries, not key[2])
+            parents[child] = key
+            key = child
+            move = self.moves[self.key_index(*key)]
+        return build_path(parents, key, self.missionaries, self.cannibals)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.missionaries, self.cannibals, self.capacity))
+            distances = uint32_array(self.distances)
+            moves = array("H", self.moves)
+            if sys.byteorder == "big":
+                distances.byteswap()
+                moves.byteswap()
+            f.write(distances.tobytes())
+            f.write(moves.tobytes())
+
+    def close(self):
+        if self.data is not None:
+            self.distances.release()
+            self.moves.release()
+            self.data.close()
+            self.data = None
+
+
+def uint32_array(values=()):
+    ## array("I") is the platform's unsigned int; the file format needs it to be 4 bytes wide
+    distances = array("I", values)
+    if distances.itemsize != 4:
+        raise ValueError("array('I') is %d bytes wide here, the table stores uint32" % distances.itemsize)
+    return distances
+
+
+def build_table(missionaries=3, cannibals=3, capacity=2):
+    ## Backward BFS from every goal state (nobody left on the left bank, boat on either side).
+    ## Crossings are reversible, so neighbors() also gives the predecessors of a state.
+    size = 2 * (missionaries + 1) * (cannibals + 1)
+    distances = uint32_array([UNREACHABLE]) * size
+    moves = array("H", [NO_MOVE]) * size
+    table = DistanceTable(missionaries, cannibals, capacity, distances, moves)
+    loads = table.loads
+    if len(loads) > NO_MOVE:
+        raise ValueError("Capacity %d has %d boat loads, the table stores at most %d"
+                         % (capacity, len(loads), NO_MOVE))
+    load_index = {load: i for i, load in enumerate(loads)}
+    index = table.key_index
+
+    frontier = deque()
+    for goal in ((0, 0, False), (0, 0, True)):
+        distances[index(*goal)] = 0
+        frontier.append(goal)
+    while frontier:
+        state = frontier.popleft()
+        distance = distances[index(*state)] + 1
+        for previous in neighbors(state, missionaries, cannibals, loads):
+            i = index(*previous)
+            if distances[i] == UNREACHABLE:
+                distances[i] = distance
+                ## Crossing from `previous` back to `state` carries the same load
+                moves[i] = load_index[(abs(previous[1] - state[1]), abs(previous[0] - state[0]))]
+                frontier.append(previous)
+    return table
+
+
+def load_table(path):
+    ## The arrays stay in the memory-mapped file: opening is O(1) whatever the instance size.
+    ## Fails before mapping anything if array("I") is not a uint32 here
+    uint32_array()
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, missionaries, cannibals, capacity = HEADER.unpack_from(data)
+    size = 2 * (missionaries + 1) * (cannibals + 1)
+    if magic != MAGIC or len(data) != HEADER.size + 6 * size:
+        data.close()
+        raise ValueError("%s is not a missionaries-and-cannibals distance table" % path)
+    if sys.byteorder == "big":
+        ## The little-endian arrays cannot be used in place: copy and byteswap them
+        distances = uint32_array()
+        distances.frombytes(data[HEADER.size:HEADER.size + 4 * size])
+        distances.byteswap()
+        moves = array("H", data[HEADER.size + 4 * size:])
+        moves.byteswap()
+        data.close()
+        return DistanceTable(missionaries, cannibals, capacity, distances, moves)
+    view = memoryview(data)
+    distances = view[HEADER.size:HEADER.size + 4 * size].cast("I")
+    moves = view[HEADER.size + 4 * size:].cast("H")
+    view.release()
+    return DistanceTable(missionaries, cannibals, capacity, distances, moves, data)
+
+
+if __name__ == "__main__":
+    ## python tabla_misioneros.py missionaries cannibals capacity [file]
+    missionaries, cannibals, capacity = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (3, 3, 2)
+    path = sys.argv[4] if len(sys.argv) > 4 else "misioneros_%d_%d_%d.tabla" % (missionaries, cannibals, capacity)
+    table = build_table(missionaries, cannibals, capacity)
+    table.save(path)
+    reachable = sum(1 for distance in table.distances if distance != UNREACHABLE)
+    print("Table saved to %s: %d states, %d can reach the goal" % (path, len(table.distances), reachable))
+    start = State(cannibals, missionaries, 'left', 0, 0)
+    if table.distance(start) is not None:
+        print("Optimal plan from the start (%d crossings):" % table.distance(start))
+        print_solution(table.path(start))
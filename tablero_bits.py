@@ -0,0 +1,172 @@
+from functools import lru_cache
+
+from geometria import generar_lineas, generar_simetrias
+
+# Hasta este tamaño las consultas se resuelven con tablas indexadas por los bits de un jugador
+MAX_CASILLAS_TABLAS = 9
+
+
+class GeometriaBits:
+    def __init__(self, filas=3, columnas=3, k=3):
+        self.casillas = filas * columnas
+        self.todas = (1 << self.casillas) - 1
+        self.mascaras = [sum(1 << pos for pos in linea) for linea in generar_lineas(filas, columnas, k)]
+        self.simetrias = generar_simetrias(filas, columnas)
+        if self.casillas <= MAX_CASILLAS_TABLAS:
+            combinaciones = range(1 << self.casillas)
+            self.gana = [self._gana(bits) for bits in combinaciones].__getitem__
+            self.lineas_libres = [self._lineas_libres(bits) for bits in combinaciones].__getitem__
+            self.posiciones = [self._posiciones(bits) for bits in combinaciones].__getitem__
+            # permutados[s][bits] = bits tras aplicar la simetría s
+            self.permutados = [[self._permutar(simetria, bits) for bits in combinaciones]
+                               for simetria in self.simetrias]
+        else:
+            self.gana = self._gana
+            self.lineas_libres = self._lineas_libres
+            self.posiciones = self._posiciones
+            self.permutados = None
+
+    def _gana(self, bits):
+        return any(bits & mascara == mascara for mascara in self.mascaras)
+
+    def _lineas_libres(self, bits):
+        return sum(1 for mascara in self.mascaras if bits & mascara == 0)
+
+    def _posiciones(self, bits):
+        posiciones = []
+        while bits:
+            menor = bits & -bits
+            posiciones.append(menor.bit_length() - 1)
+            bits ^= menor
+        return tuple(posiciones)
+
+    def _permutar(self, simetria, bits):
+        return sum(1 << j for j, pos in enumerate(simetria) if bits >> pos & 1)
+
+    def permutar(self, indice_simetria, bits):
+        if self.permutados is not None:
+            return self.permutados[indice_simetria][bits]
+        return self._permutar(self.simetrias[indice_simetria], bits)
+
+
+@lru_cache(maxsize=None)
+def obtener_geometria_bits(filas=3, columnas=3, k=3):
+    return GeometriaBits(filas, columnas, k)
+
+
+class TableroBits:
+    # Tablero guardado como dos enteros (un bit por casilla y jugador).
+    # Se comporta como la lista de casillas para el resto del código (indexar, asignar, comparar).
+    def __init__(self, fichas=("X", "O"), casillas=None, n=9):
+        self.fichas = fichas
+        self.indices = {ficha: i for i, ficha in enumerate(fichas)}
+        self.n = n
+        self.bits = [0, 0]
+        if casillas is not None:
+            self[:] = casillas
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self[i] for i in range(self.n)[posicion]]
+        bit = 1 << posicion
+        if self.bits[0] & bit:
+            return self.fichas[0]
+        if self.bits[1] & bit:
+            return self.fichas[1]
+        return " "
+
+    def __setitem__(self, posicion, valor):
+        if isinstance(posicion, slice):
+            for i, v in zip(range(self.n)[posicion], valor):
+                self[i] = v
+            return
+        bit = 1 << posicion
+        self.bits[0] &= ~bit
+        self.bits[1] &= ~bit
+        if valor != " ":
+            self.bits[self.indices[valor]] |= bit
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __contains__(self, valor):
+        if valor == " ":
+            return self.bits[0] | self.bits[1] != (1 << self.n) - 1
+        indice = self.indices.get(valor)
+        return indice is not None and self.bits[indice] != 0
+
+    def __eq__(self, otro):
+        if isinstance(otro, TableroBits):
+            return self[:] == otro[:]
+        return self[:] == list(otro)
+
+    def __repr__(self):
+        return f"TableroBits({self[:]!r})"
+
+    def copy(self):
+        copia = TableroBits(self.fichas, n=self.n)
+        copia.bits = list(self.bits)
+        return copia
+
+
+class MotorBits:
+    # Mezcla para TresEnRaya: sustituye las comprobaciones sobre la lista por operaciones de bits
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.geometria_bits = obtener_geometria_bits(self.filas, self.columnas, self.k)
+        self.tablero = TableroBits((self.jugador_ia, self.jugador_humano), n=self.geometria_bits.casillas)
+
+    def movimientos_disponibles(self):
+        bits = self.tablero.bits
+        return self.geometria_bits.posiciones(self.geometria_bits.todas & ~(bits[0] | bits[1]))
+
+    def verificar_ganador(self):
+        bits = self.tablero.bits
+        if self.geometria_bits.gana(bits[0]):
+            return self.tablero.fichas[0]
+        if self.geometria_bits.gana(bits[1]):
+            return self.tablero.fichas[1]
+        return None
+
+    def tablero_lleno(self):
+        bits = self.tablero.bits
+        return bits[0] | bits[1] == self.geometria_bits.todas
+
+    def evaluar_heuristica(self):
+        bits = self.tablero.bits
+        lineas_ia = self.geometria_bits.lineas_libres(bits[1])
+        lineas_humano = self.geometria_bits.lineas_libres(bits[0])
+        return lineas_ia - lineas_humano, lineas_ia, lineas_humano
+
+    def hacer_movimiento(self, posicion, jugador):
+        self.tablero.bits[self.tablero.indices[jugador]] |= 1 << posicion
+        self.sumar_a_lineas(posicion, jugador)
+
+    def deshacer_movimiento(self, posicion):
+        bit = 1 << posicion
+        bits = self.tablero.bits
+        indice = 0 if bits[0] & bit else 1
+        bits[indice] &= ~bit
+        self.restar_de_lineas(posicion, self.tablero.fichas[indice])
+
+    def clave_tablero(self, es_maximizando):
+        ia, humano = self.tablero.bits
+        geometria = self.geometria_bits
+        mejor_clave = None
+        mejor_simetria = 0
+        if geometria.permutados is not None:
+            for indice, permutados in enumerate(geometria.permutados):
+                clave = permutados[ia] << geometria.casillas | permutados[humano]
+                if mejor_clave is None or clave < mejor_clave:
+                    mejor_clave = clave
+                    mejor_simetria = indice
+        else:
+            for indice in range(len(geometria.simetrias)):
+                clave = geometria.permutar(indice, ia) << geometria.casillas | geometria.permutar(indice, humano)
+                if mejor_clave is None or clave < mejor_clave:
+                    mejor_clave = clave
+                    mejor_simetria = indice
+        return (mejor_clave, es_maximizando), mejor_simetria
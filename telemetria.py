@@ -0,0 +1,133 @@
+import json
+import math
+import random
+
+
+class MuestreoAcotado:
+    # Muestra uniforme de tamaño fijo de una secuencia de longitud desconocida (muestreo de reservorio).
+    # Sustituye a las listas que crecían con cada poda: la memoria no depende del tamaño de la búsqueda
+    def __init__(self, capacidad=64, semilla=None):
+        if capacidad <= 0:
+            raise ValueError("La capacidad del muestreo debe ser positiva")
+        self.capacidad = capacidad
+        self.azar = random.Random(semilla)
+        self.muestras = []
+        self.vistos = 0
+
+    def __len__(self):
+        return len(self.muestras)
+
+    def __iter__(self):
+        return iter(self.muestras)
+
+    def agregar(self, valor):
+        self.vistos += 1
+        if len(self.muestras) < self.capacidad:
+            self.muestras.append(valor)
+            return
+        indice = self.azar.randrange(self.vistos)
+        if indice < self.capacidad:
+            self.muestras[indice] = valor
+
+    def fusionar(self, otro):
+        # Une la muestra de otro reservorio (p. ej. la de un proceso trabajador) respetando
+        # cuántos elementos vio cada uno
+        propias, ajenas = list(self.muestras), list(otro.muestras)
+        self.azar.shuffle(propias)
+        self.azar.shuffle(ajenas)
+        restantes_propios, restantes_ajenos = self.vistos, otro.vistos
+        resultado = []
+        while len(resultado) < self.capacidad and (propias or ajenas):
+            if ajenas and (not propias or
+                           self.azar.random() * (restantes_propios + restantes_ajenos) < restantes_ajenos):
+                resultado.append(ajenas.pop())
+                restantes_ajenos -= 1
+            else:
+                resultado.append(propias.pop())
+                restantes_propios -= 1
+        self.muestras = resultado
+        self.vistos += otro.vistos
+
+    def limpiar(self):
+        self.muestras = []
+        self.vistos = 0
+
+
+class EstadisticasBusqueda:
+    # Estadísticas de un turno. Las profundidades son las de minimax_ab (0 = tras la jugada de la raíz)
+    def __init__(self):
+        self.nodos = []  # nodos[profundidad] = nodos visitados
+        self.cortes_primera = []  # cortes producidos por la primera jugada probada, por profundidad
+        self.cortes_posteriores = []  # cortes producidos por cualquier otra jugada
+        self.cortes_tt = 0  # nodos resueltos directamente con la tabla de transposición
+        self.tiempo_raiz = {}  # jugada de la raíz -> segundos acumulados en todas las iteraciones
+        self.iteraciones = []  # [(profundidad límite, nodos, segundos)] de la profundización iterativa
+
+    def nodo(self, profundidad):
+        nodos = self.nodos
+        while len(nodos) <= profundidad:
+            nodos.append(0)
+        nodos[profundidad] += 1
+
+    def corte(self, profundidad, indice):
+        cortes = self.cortes_primera if indice == 0 else self.cortes_posteriores
+        while len(cortes) <= profundidad:
+            cortes.append(0)
+        cortes[profundidad] += 1
+
+    def raiz(self, movimiento, segundos):
+        self.tiempo_raiz[movimiento] = self.tiempo_raiz.get(movimiento, 0.0) + segundos
+
+    def fusionar(self, otra):
+        for propia, ajena in ((self.nodos, otra.nodos), (self.cortes_primera, otra.cortes_primera),
+                              (self.cortes_posteriores, otra.cortes_posteriores)):
+            while len(propia) < len(ajena):
+                propia.append(0)
+            for profundidad, valor in enumerate(ajena):
+                propia[profundidad] += valor
+        self.cortes_tt += otra.cortes_tt
+        for movimiento, segundos in otra.tiempo_raiz.items():
+            self.raiz(movimiento, segundos)
+
+    def ramificacion_efectiva(self):
+        # b* tal que un árbol uniforme de profundidad d con factor b* tendría los mismos nodos: N ≈ b*^d
+        total = sum(self.nodos)
+        profundidad = len(self.nodos)
+        if total <= 1 or profundidad == 0:
+            return 0.0
+        return total ** (1 / profundidad)
+
+    def resumen(self, contador=None, tabla=None):
+        cortes = sum(self.cortes_primera) + sum(self.cortes_posteriores)
+        registro = {
+            "nodos_por_profundidad": self.nodos,
+            "cortes_primera": self.cortes_primera,
+            "cortes_posteriores": self.cortes_posteriores,
+            "porcentaje_cortes_primera": round(100 * sum(self.cortes_primera) / cortes, 2) if cortes else None,
+            "ramificacion_efectiva": round(self.ramificacion_efectiva(), 3),
+            "iteraciones": [{"profundidad": limite, "nodos": nodos, "segundos": round(segundos, 6)}
+                            for limite, nodos, segundos in self.iteraciones],
+            "tiempo_raiz": {str(movimiento): round(segundos, 6) for movimiento, segundos in self.tiempo_raiz.items()},
+            "tt_cortes": self.cortes_tt,
+        }
+        if contador is not None:
+            registro.update({clave: contador[clave] for clave in ("evaluados", "podados", "re_busquedas",
+                                                                   "tt_aciertos", "tt_fallos", "tt_guardados")})
+        if tabla is not None:
+            registro["tt_entradas"] = len(tabla)
+            registro["tt_desalojos"] = tabla.desalojos
+        return registro
+
+
+def escribir_jsonl(ruta, registro):
+    # Una línea JSON por turno: se puede seguir con `tail -f` o cargar con pandas.read_json(lines=True)
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def percentil(valores, p):
+    # Percentil por rango más cercano (p en 0-100); None si no hay valores
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
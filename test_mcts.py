@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+from mcts import TresEnRayaMCTS, TresEnRayaMCTSBits
+
+# X (la IA) gana en 2; en el segundo tablero debe tapar la fila de O en 5
+GANA = list("XX OO    ")
+TAPA = list("X  OO   X")
+
+
+@pytest.mark.parametrize("clase", [TresEnRayaMCTS, TresEnRayaMCTSBits])
+def test_jugadas_forzadas(clase):
+    motor = clase(silencioso=True, usar_libro=False, nodos_por_jugada=2000, semilla=0)
+    for tablero, esperado in ((GANA, 2), (TAPA, 5)):
+        motor.tablero[:] = tablero
+        assert motor.obtener_mejor_movimiento() == esperado
+
+
+def test_raiz_paralela():
+    # Cada proceso hace su propio árbol con el presupuesto completo; las visitas de la raíz se suman
+    motor = TresEnRayaMCTS(silencioso=True, usar_libro=False, nodos_por_jugada=500, semilla=0, procesos=2,
+                           telemetria=True)
+    try:
+        for tablero, esperado in ((GANA, 2), (TAPA, 5)):
+            motor.tablero[:] = tablero
+            assert motor.obtener_mejor_movimiento() == esperado
+            registro = motor.ultima_telemetria
+            assert registro["procesos"] == 2 and registro["simulaciones"] == 1000
+            assert sum(registro["visitas_raiz"].values()) == 1000
+            assert motor.tablero == tablero
+    finally:
+        motor.cerrar()
+
+
+def test_respeta_el_tiempo_en_tableros_grandes():
+    # En 15x15 cada simulación es cara: el reloj no puede esperar a un bloque de iteraciones
+    motor = TresEnRayaMCTS(15, 15, 5, silencioso=True, usar_libro=False, tiempo_por_jugada=0.2, semilla=0)
+    inicio = time.perf_counter()
+    motor.obtener_mejor_movimiento()
+    assert time.perf_counter() - inicio < 0.26
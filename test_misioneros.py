@@ -0,0 +1,131 @@
+import pytest
+
+import anchura_misioneros
+from misioneros_disco import external_breadth_first_search
+from misioneros_vectorizado import vectorized_breadth_first_search
+from tabla_misioneros import build_table, load_table
+
+# Instancias del río: con solución, de una sola travesía, imposibles y con la orilla inicial inválida
+CASOS_RIO = [(3, 3, 2), (5, 5, 3), (4, 4, 3), (4, 4, 2), (2, 3, 2), (20, 15, 3), (30, 30, 4), (1, 1, 2)]
+
+
+def claves(solucion):
+    # Estados (cannibalLeft, missionaryLeft, boat) de una solución, desde el inicial
+    estados = []
+    while solucion is not None:
+        estados.append((solucion.cannibalLeft, solucion.missionaryLeft, solucion.boat))
+        solucion = solucion.parent
+    return estados[::-1]
+
+
+def es_plan_valido(estados, misioneros, canibales, capacidad):
+    cargas = anchura_misioneros.boat_loads(capacidad)
+    tuplas = [(c, m, barca == 'left') for c, m, barca in estados]
+    return tuplas[0] == (canibales, misioneros, True) and tuplas[-1][:2] == (0, 0) and all(
+        siguiente in anchura_misioneros.neighbors(estado, misioneros, canibales, cargas)
+        for estado, siguiente in zip(tuplas, tuplas[1:]))
+
+
+@pytest.mark.parametrize("misioneros, canibales, capacidad, travesias",
+                         [(3, 3, 2, 11), (5, 5, 3, 11), (1, 1, 2, 1), (4, 4, 2, None), (2, 3, 2, None)])
+def test_bfs_generalizado(misioneros, canibales, capacidad, travesias):
+    solucion = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    if travesias is None:
+        assert solucion is None
+        return
+    estados = claves(solucion)
+    assert len(estados) - 1 == travesias
+    assert es_plan_valido(estados, misioneros, canibales, capacidad)
+
+
+@pytest.mark.parametrize("misioneros, canibales, capacidad", CASOS_RIO)
+def test_bfs_devuelve_planes_validos(misioneros, canibales, capacidad):
+    solucion = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    assert solucion is None or es_plan_valido(claves(solucion), misioneros, canibales, capacidad)
+
+
+@pytest.mark.parametrize("misioneros, canibales, capacidad", CASOS_RIO)
+def test_bfs_vectorizada_igual_que_bfs(misioneros, canibales, capacidad):
+    # Misma solución exacta, no solo de la misma longitud
+    bfs = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    assert claves(vectorized_breadth_first_search(misioneros, canibales, capacidad)) == claves(bfs)
+
+
+@pytest.mark.parametrize("metodo", ["astar", "bidirectional"])
+@pytest.mark.parametrize("misioneros, canibales, capacidad", CASOS_RIO)
+def test_busquedas_informadas_optimas(metodo, misioneros, canibales, capacidad):
+    # A* y la bidireccional pueden elegir otro plan, pero de la misma longitud que el de la BFS
+    bfs = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    solucion = anchura_misioneros.solve(misioneros, canibales, capacidad, metodo)
+    if bfs is None:
+        assert solucion is None
+        return
+    estados = claves(solucion)
+    assert len(estados) == len(claves(bfs))
+    assert es_plan_valido(estados, misioneros, canibales, capacidad)
+
+
+def test_metodo_desconocido():
+    with pytest.raises(ValueError):
+        anchura_misioneros.solve(3, 3, 2, "dfs")
+
+
+# Desde la capacidad 22 hay más de 255 cargas posibles para la barca
+@pytest.mark.parametrize("misioneros, canibales, capacidad", CASOS_RIO + [(30, 30, 22), (40, 35, 30)])
+def test_tabla_de_distancias_igual_que_bfs(tmp_path, misioneros, canibales, capacidad):
+    # La tabla se guarda y se vuelve a cargar: se comprueba el archivo, no solo la construcción
+    bfs = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    inicial = anchura_misioneros.State(canibales, misioneros, 'left', 0, 0)
+    ruta = str(tmp_path / "rio.tabla")
+    build_table(misioneros, canibales, capacidad).save(ruta)
+    tabla = load_table(ruta)
+    try:
+        if bfs is None:
+            assert not inicial.is_valid() or tabla.distance(inicial) is None
+            return
+        referencia = claves(bfs)
+        assert tabla.distance(inicial) == len(referencia) - 1
+        estados = claves(tabla.path(inicial))
+        assert len(estados) == len(referencia)
+        assert es_plan_valido(estados, misioneros, canibales, capacidad)
+    finally:
+        tabla.close()
+
+
+# (20, 15, 3) tiene unos 3.5e10 planes óptimos: solo se cuentan, no se enumeran
+@pytest.mark.parametrize("misioneros, canibales, capacidad", [caso for caso in CASOS_RIO if caso != (20, 15, 3)])
+def test_enumeracion_y_conteo_de_soluciones_optimas(misioneros, canibales, capacidad):
+    bfs = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    planes = [claves(solucion) for solucion in
+              anchura_misioneros.all_optimal_solutions(misioneros, canibales, capacidad)]
+    assert anchura_misioneros.count_optimal_solutions(misioneros, canibales, capacidad) == len(planes)
+    if bfs is None:
+        assert planes == []
+        return
+    assert claves(bfs) in planes
+    assert len(set(map(tuple, planes))) == len(planes)
+    for estados in planes:
+        assert len(estados) == len(claves(bfs))
+        assert es_plan_valido(estados, misioneros, canibales, capacidad)
+
+
+def test_conteo_sin_enumerar():
+    assert anchura_misioneros.count_optimal_solutions(20, 15, 3) == 35193565680
+
+
+@pytest.mark.parametrize("misioneros, canibales, capacidad", CASOS_RIO)
+def test_bfs_externa_igual_que_bfs(tmp_path, misioneros, canibales, capacidad):
+    bfs = anchura_misioneros.breadth_first_search(misioneros, canibales, capacidad)
+    externa = external_breadth_first_search(misioneros, canibales, capacidad, workdir=str(tmp_path))
+    assert claves(externa) == claves(bfs)
+
+
+def test_bfs_externa_reutiliza_el_directorio(tmp_path):
+    # Las capas de una búsqueda anterior no se mezclan con las de la siguiente
+    for misioneros, canibales, capacidad in ((5, 4, 3), (4, 4, 3)):
+        reutilizado = {}
+        nuevo = {}
+        external_breadth_first_search(misioneros, canibales, capacidad, reutilizado, workdir=str(tmp_path / "comun"))
+        external_breadth_first_search(misioneros, canibales, capacidad, nuevo,
+                                      workdir=str(tmp_path / f"{misioneros}m{canibales}c"))
+        assert reutilizado["expanded"] == nuevo["expanded"]
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from mcts import TresEnRayaMCTS
+from poda_AB import TresEnRaya
+from ponderacion import Ponderador
+
+
+def posiciones_del_humano(cantidad, semilla=0):
+    # Tableros 3x3 sin terminar en los que le toca al humano (O), tras la jugada de la IA (X)
+    azar = random.Random(semilla)
+    motor = TresEnRaya(silencioso=True, usar_libro=False)
+    posiciones = set()
+    while len(posiciones) < cantidad:
+        motor.tablero[:] = [" "] * 9
+        for turno in range(azar.choice((1, 3, 5))):
+            libres = motor.movimientos_disponibles()
+            motor.tablero[azar.choice(libres)] = "X" if turno % 2 == 0 else "O"
+            if motor.juego_terminado():
+                break
+        else:
+            posiciones.add("".join(motor.tablero).replace(" ", "."))
+    return sorted(posiciones)
+
+
+def pensar_todo(motor, tablero):
+    # Deja que el Ponderador busque la respuesta a cada jugada del humano, sin cancelar nada
+    motor.tablero[:] = tablero
+    ponderador = Ponderador(motor)
+    ponderador.iniciar()
+    ponderador.hilo.join()
+    return {clave: movimiento for clave, (movimiento, _, _) in ponderador.cache.items()}
+
+
+# El tablero vacío incluye "...O....." (la IA contesta en 0), que la profundización iterativa contestaba con 4
+@pytest.mark.parametrize("tablero", ["........."] + posiciones_del_humano(12))
+def test_respuesta_ponderada_igual_a_la_directa(tablero):
+    tablero = [" " if casilla == "." else casilla for casilla in tablero]
+    pensadas = pensar_todo(TresEnRaya(silencioso=True, usar_libro=False), tablero)
+    assert pensadas
+    for clave, movimiento in pensadas.items():
+        directo = TresEnRaya(silencioso=True, usar_libro=False)
+        directo.tablero[:] = clave
+        assert directo.obtener_mejor_movimiento() == movimiento, "".join(clave)
+
+
+def test_ponderacion_mcts():
+    # El pensador de MCTS usa el mismo presupuesto de simulaciones que el motor del juego
+    motor = TresEnRayaMCTS(silencioso=True, usar_libro=False, nodos_por_jugada=200)
+    pensadas = pensar_todo(motor, [" "] * 4 + ["X"] + [" "] * 4)
+    assert len(pensadas) == 8
+    assert all(clave[movimiento] == " " for clave, movimiento in pensadas.items())
+
+
+def test_cancelacion_sin_presupuesto():
+    # La búsqueda completa de la primera jugada se interrumpe aunque no tenga límite de tiempo
+    motor = TresEnRaya(silencioso=True, usar_libro=False, capacidad_tt=0)
+    ponderador = Ponderador(motor)
+    ponderador.iniciar()
+    motor.tablero[0] = motor.jugador_humano
+    ponderador.detener()
+    assert not ponderador.cache
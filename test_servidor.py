@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import pytest
+
+from servidor import LIMITE_LINEA, ServidorJuego
+from telemetria import percentil
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorJuego(procesos=1)
+    yield servidor
+    servidor.cerrar()
+
+
+async def pedir(conexion, peticion):
+    lector, escritor = conexion
+    escritor.write((peticion if isinstance(peticion, bytes) else json.dumps(peticion).encode()) + b"\n")
+    await escritor.drain()
+    return json.loads(await lector.readline())
+
+
+def conversar(servidor, ruta, dialogo):
+    # Levanta el servidor en un socket Unix y ejecuta dialogo(conectar) contra él
+    async def principal():
+        red = await asyncio.start_unix_server(servidor.atender, ruta, limit=LIMITE_LINEA)
+        abiertas = []
+
+        async def conectar():
+            abiertas.append(await asyncio.open_unix_connection(ruta))
+            return abiertas[-1]
+
+        try:
+            return await dialogo(conectar)
+        finally:
+            for _, escritor in abiertas:
+                escritor.close()
+                await escritor.wait_closed()
+            red.close()
+            await red.wait_closed()
+    return asyncio.run(principal())
+
+
+def test_partida_completa(servidor, tmp_path):
+    async def dialogo(conectar):
+        conexion = await conectar()
+        estado = await pedir(conexion, {"op": "nueva", "empieza": "ia"})
+        assert estado["ia"] is not None and estado["tablero"].count("X") == 1
+        while not estado["terminada"]:
+            estado = await pedir(conexion, {"op": "mover", "sesion": estado["sesion"],
+                                            "posicion": estado["tablero"].index(" ")})
+            assert "error" not in estado
+        # Jugando perfecto la IA no pierde
+        assert estado["ganador"] in ("X", None)
+        assert (await pedir(conexion, {"op": "cerrar", "sesion": estado["sesion"]}))["cerrada"]
+        return await pedir(conexion, {"op": "estadisticas"})
+
+    resumen = conversar(servidor, str(tmp_path / "s"), dialogo)
+    assert resumen["sesiones"] == 0 and resumen["busquedas"] >= 1
+
+
+def test_sesion_de_otra_conexion(servidor, tmp_path):
+    async def dialogo(conectar):
+        propia, ajena = await conectar(), await conectar()
+        sesion = (await pedir(propia, {"op": "nueva"}))["sesion"]
+        assert "error" in await pedir(ajena, {"op": "mover", "sesion": sesion, "posicion": 0})
+        assert "error" in await pedir(ajena, {"op": "cerrar", "sesion": sesion})
+        respuesta = await pedir(propia, {"op": "mover", "sesion": sesion, "posicion": 0})
+        assert respuesta["tablero"][0] == "O"
+
+    conversar(servidor, str(tmp_path / "s"), dialogo)
+    # Al cerrarse la conexión se liberan sus sesiones
+    assert servidor.sesiones == {}
+
+
+def test_errores_por_peticion(servidor, tmp_path):
+    async def dialogo(conectar):
+        conexion = await conectar()
+        assert "error" in await pedir(conexion, b"no es json")
+        assert "error" in await pedir(conexion, b"x" * (2 * LIMITE_LINEA))
+        assert "error" in await pedir(conexion, {"op": "nueva", "filas": 3, "columnas": 3, "k": 4})
+        # La conexión sigue sirviendo peticiones tras los errores
+        return await pedir(conexion, {"op": "nueva"})
+
+    assert "sesion" in conversar(servidor, str(tmp_path / "s"), dialogo)
+
+
+def test_percentil():
+    assert percentil([], 50) is None
+    assert percentil([5, 1, 3, 2, 4], 50) == 3
+    assert percentil(list(range(1, 101)), 99) == 99
+
+
+def test_posicion_booleana(servidor, tmp_path):
+    async def dialogo(conectar):
+        conexion = await conectar()
+        sesion = (await pedir(conexion, {"op": "nueva"}))["sesion"]
+        assert "error" in await pedir(conexion, {"op": "mover", "sesion": sesion, "posicion": True})
+        return await pedir(conexion, {"op": "mover", "sesion": sesion, "posicion": 1})
+
+    assert conversar(servidor, str(tmp_path / "s"), dialogo)["tablero"][1] == "O"
+
+
+def test_nueva_sin_jugada_de_la_ia_no_abre_sesion(servidor, tmp_path, monkeypatch):
+    async def falla(sesion):
+        raise RuntimeError("búsqueda fallida")
+
+    monkeypatch.setattr(servidor, "jugada_ia", falla)
+
+    async def dialogo(conectar):
+        conexion = await conectar()
+        assert "error" in await pedir(conexion, {"op": "nueva", "empieza": "ia"})
+        # Sin cerrar la conexión la sesión fallida ya no cuenta
+        return await pedir(conexion, {"op": "estadisticas"})
+
+    assert conversar(servidor, str(tmp_path / "s"), dialogo)["sesiones"] == 0
@@ -0,0 +1,41 @@
+import json
+
+from poda_AB import TresEnRaya
+from telemetria import MuestreoAcotado
+
+
+def test_registro_del_turno(tmp_path):
+    ruta = tmp_path / "turnos.jsonl"
+    motor = TresEnRaya(silencioso=True, usar_libro=False, ruta_telemetria=str(ruta))
+    motor.tablero[4] = motor.jugador_humano
+    movimiento = motor.obtener_mejor_movimiento()
+    registro = motor.ultima_telemetria
+    assert registro["movimiento"] == movimiento
+    # Los nodos de la profundidad 0 son las jugadas de la raíz, que no cuentan como evaluados
+    assert registro["nodos_por_profundidad"][0] == 8
+    assert sum(registro["nodos_por_profundidad"][1:]) == registro["evaluados"]
+    assert [iteracion["nodos"] for iteracion in registro["iteraciones"]] == [registro["evaluados"]]
+    assert registro["tt_entradas"] <= registro["tt_guardados"]
+    assert [json.loads(linea) for linea in ruta.read_text(encoding="utf-8").splitlines()] == [registro]
+
+
+def test_iteraciones_con_presupuesto():
+    motor = TresEnRaya(4, 4, 3, silencioso=True, usar_libro=False, telemetria=True, nodos_por_jugada=3000)
+    motor.obtener_mejor_movimiento()
+    registro = motor.ultima_telemetria
+    profundidades = [iteracion["profundidad"] for iteracion in registro["iteraciones"]]
+    assert profundidades == list(range(1, registro["profundidad_completada"] + 1))
+    # La iteración interrumpida no se registra, pero sus nodos sí cuentan
+    assert sum(iteracion["nodos"] for iteracion in registro["iteraciones"]) <= registro["evaluados"]
+
+
+def test_muestreo_acotado():
+    muestreo = MuestreoAcotado(10, semilla=0)
+    for valor in range(1000):
+        muestreo.agregar(valor)
+    otro = MuestreoAcotado(10, semilla=1)
+    for valor in range(1000, 1500):
+        otro.agregar(valor)
+    muestreo.fusionar(otro)
+    assert len(muestreo) == 10 and muestreo.vistos == 1500
+    assert len(set(muestreo)) == 10 and all(0 <= valor < 1500 for valor in muestreo)
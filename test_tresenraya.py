@@ -0,0 +1,240 @@
+import json
+import random
+import time
+
+import numpy as np
+import pytest
+
+import tresenraya_minimax
+from arbol_busqueda import CapturaArbol, leer_raices, leer_subarbol
+from evaluacion_lotes import HUMANO, IA, VACIA, evaluar_lote
+from libro_tresenraya import LibroAperturas, construir_libro
+from poda_AB import ESTRATEGIAS, TresEnRaya, TresEnRayaBits, nuevo_contador
+
+# Comprobaciones del motor de poda_AB: cada variante rápida da lo mismo que la de referencia
+MOTORES = (TresEnRaya, TresEnRayaBits)
+
+
+def partida_al_azar(motor, azar, jugadas):
+    # Hasta `jugadas` jugadas alternas desde el tablero vacío, parando si la partida termina
+    motor.tablero[:] = [" "] * motor.casillas
+    fichas = (motor.jugador_ia, motor.jugador_humano)
+    for turno in range(jugadas):
+        if motor.juego_terminado():
+            break
+        motor.tablero[azar.choice(motor.movimientos_disponibles())] = fichas[turno % 2]
+    return list(motor.tablero)
+
+
+def posiciones_de_la_ia(filas, columnas, k, cantidad, min_jugadas, max_jugadas, semilla=0):
+    # Posiciones sin terminar en las que mueve la IA (X), con un número par de fichas
+    azar = random.Random(semilla)
+    motor = TresEnRaya(filas, columnas, k, silencioso=True, usar_libro=False)
+    posiciones = []
+    while len(posiciones) < cantidad:
+        tablero = partida_al_azar(motor, azar, 2 * azar.randint(min_jugadas, max_jugadas))
+        if not motor.juego_terminado() and tablero.count("X") == tablero.count("O"):
+            posiciones.append(tablero)
+    return posiciones
+
+
+def valores_raiz(clase, filas, columnas, k, tablero, estrategia, **opciones):
+    # Valor de cada jugada de la IA en la raíz, con la estrategia pedida
+    motor = clase(filas, columnas, k, silencioso=True, usar_libro=False, **opciones)
+    motor.tablero[:] = tablero
+    motor.sincronizar()
+    valores = {}
+    for movimiento in motor.movimientos_disponibles():
+        motor.hacer_movimiento(movimiento, motor.jugador_ia)
+        valores[movimiento] = motor.evaluar_jugada_raiz(estrategia, nuevo_contador())
+        motor.deshacer_movimiento(movimiento)
+    return valores
+
+
+@pytest.mark.parametrize("filas, columnas, k, min_jugadas, max_jugadas",
+                         [(3, 3, 3, 1, 3), (4, 4, 3, 5, 6), (3, 4, 3, 2, 4)])
+def test_estrategias_dan_los_mismos_valores(filas, columnas, k, min_jugadas, max_jugadas):
+    for tablero in posiciones_de_la_ia(filas, columnas, k, 6, min_jugadas, max_jugadas):
+        referencia = valores_raiz(TresEnRaya, filas, columnas, k, tablero, "minimax")
+        for clase in MOTORES:
+            for estrategia in ESTRATEGIAS:
+                assert valores_raiz(clase, filas, columnas, k, tablero, estrategia) == referencia, \
+                    (clase.__name__, estrategia, "".join(tablero))
+
+
+@pytest.mark.parametrize("ordenamiento", [(), ("estatico",), ("hash", "killer", "historia", "estatico")])
+def test_respeta_el_tiempo_en_tableros_grandes(ordenamiento):
+    # En 15x15 cada nodo es caro y el orden estático hace y deshace todas las jugadas de cada nodo
+    motor = TresEnRaya(15, 15, 5, silencioso=True, usar_libro=False, tiempo_por_jugada=0.2,
+                       ordenamiento=ordenamiento)
+    motor.tablero[112] = motor.jugador_humano
+    inicio = time.perf_counter()
+    movimiento = motor.obtener_mejor_movimiento()
+    assert time.perf_counter() - inicio < 0.25
+    assert motor.tablero[movimiento] == " "
+
+
+@pytest.mark.parametrize("clase", MOTORES)
+def test_misma_jugada_con_ambos_tableros(clase):
+    for tablero in posiciones_de_la_ia(3, 3, 3, 20, 0, 3, semilla=1):
+        listas = TresEnRaya(silencioso=True, usar_libro=False)
+        listas.tablero[:] = tablero
+        motor = clase(silencioso=True, usar_libro=False)
+        motor.tablero[:] = tablero
+        assert motor.obtener_mejor_movimiento() == listas.obtener_mejor_movimiento(), "".join(tablero)
+
+
+def test_minimax_sin_poda_con_bitboards():
+    # El minimax de tresenraya_minimax sobre los dos enteros da los mismos valores que sobre la lista
+    for tablero in posiciones_de_la_ia(3, 3, 3, 10, 2, 3, semilla=5):
+        listas = tresenraya_minimax.TresEnRaya(usar_libro=False, silencioso=True)
+        bits = tresenraya_minimax.TresEnRayaBits(usar_libro=False, silencioso=True)
+        listas.tablero[:] = tablero
+        bits.tablero[:] = tablero
+        for es_maximizando in (True, False):
+            assert bits.minimax(0, es_maximizando) == listas.minimax(0, es_maximizando), "".join(tablero)
+        assert bits.tablero == tablero
+
+
+@pytest.fixture(scope="module")
+def libro(tmp_path_factory):
+    ruta = tmp_path_factory.mktemp("libro") / "libro_tresenraya.bin"
+    construir_libro(str(ruta))
+    libro = LibroAperturas(str(ruta))
+    yield libro
+    libro.cerrar()
+
+
+def test_libro_igual_que_minimax_ab(libro):
+    # El libro guarda el valor para quien mueve (X con fichas pares, O con impares) y, a igualdad,
+    # la casilla de menor índice
+    azar = random.Random(2)
+    motor = TresEnRaya(silencioso=True, usar_libro=False)
+    for _ in range(120):
+        tablero = partida_al_azar(motor, azar, azar.randint(0, 8))
+        if motor.juego_terminado():
+            continue
+        ia, humano = ("X", "O") if tablero.count("X") == tablero.count("O") else ("O", "X")
+        valores = valores_raiz(TresEnRaya, 3, 3, 3, tablero, "alfabeta", jugador_ia=ia, jugador_humano=humano)
+        mejor = max(valores.values())
+        assert libro.consultar(tablero, ia) == (mejor, min(m for m, v in valores.items() if v == mejor)), \
+            "".join(tablero)
+
+
+@pytest.mark.parametrize("filas, columnas, k", [(3, 3, 3), (4, 4, 3), (3, 5, 4), (4, 4, 4)])
+def test_evaluar_lote_igual_que_cada_tablero(filas, columnas, k):
+    azar = random.Random(3)
+    motores = [clase(filas, columnas, k, silencioso=True, usar_libro=False) for clase in MOTORES]
+    # Tableros cualesquiera para las líneas abiertas; partidas reales para el ganador (uno como mucho)
+    tableros = [[azar.choice(" XO") for _ in range(filas * columnas)] for _ in range(100)]
+    partidas = [partida_al_azar(motores[0], azar, azar.randint(0, filas * columnas)) for _ in range(100)]
+    f_valor, lineas_ia, lineas_humano, _ = motores[0].evaluar_lote(tableros)
+    _, _, _, ganador = motores[0].evaluar_lote(partidas)
+    fichas = {VACIA: None, IA: "X", HUMANO: "O"}
+    for motor in motores:
+        for i, tablero in enumerate(tableros):
+            motor.tablero[:] = tablero
+            assert motor.evaluar_heuristica() == (f_valor[i], lineas_ia[i], lineas_humano[i])
+        for i, tablero in enumerate(partidas):
+            motor.tablero[:] = tablero
+            assert motor.verificar_ganador() == fichas[ganador[i]]
+
+
+def test_evaluar_lote_sin_lineas():
+    # Con k mayor que el tablero no hay ninguna línea: todo vale 0 y nadie gana
+    tableros = np.array([[VACIA] * 9, [IA] * 9, [HUMANO] * 9], dtype=np.int8)
+    for resultado in evaluar_lote(tableros, 3, 3, 4):
+        assert resultado.tolist() == [0, 0, 0]
+
+
+def estado_incremental(motor):
+    return (list(motor.tablero), {ficha: list(conteo) for ficha, conteo in motor.conteo_lineas.items()},
+            dict(motor.lineas_completas), dict(motor.lineas_abiertas), motor.vacias)
+
+
+@pytest.mark.parametrize("clase", MOTORES)
+@pytest.mark.parametrize("filas, columnas, k", [(3, 3, 3), (4, 5, 4)])
+def test_hacer_y_deshacer_restauran_el_estado(clase, filas, columnas, k):
+    azar = random.Random(4)
+    motor = clase(filas, columnas, k, silencioso=True, usar_libro=False)
+    for _ in range(20):
+        motor.tablero[:] = partida_al_azar(motor, azar, azar.randint(0, filas * columnas // 2))
+        motor.sincronizar()
+        inicial = estado_incremental(motor)
+        hechas = []
+        while motor.movimientos_disponibles() and azar.random() < 0.9:
+            movimiento = azar.choice(motor.movimientos_disponibles())
+            motor.hacer_movimiento(movimiento, azar.choice((motor.jugador_ia, motor.jugador_humano)))
+            hechas.append(movimiento)
+            # El estado mantenido jugada a jugada es el que se recalcula desde cero
+            actual = estado_incremental(motor)
+            motor.sincronizar()
+            assert estado_incremental(motor) == actual
+        for movimiento in reversed(hechas):
+            motor.deshacer_movimiento(movimiento)
+        assert estado_incremental(motor) == inicial
+
+
+@pytest.fixture(scope="module")
+def motor_paralelo():
+    motor = TresEnRaya(silencioso=True, usar_libro=False, procesos=2)
+    yield motor
+    motor.cerrar()
+
+
+def test_raiz_paralela_igual_que_en_un_proceso(motor_paralelo):
+    # La mejor jugada de la raíz y su valor exacto no dependen de cuántos procesos buscan
+    for tablero in posiciones_de_la_ia(3, 3, 3, 8, 1, 3, semilla=6):
+        unico = TresEnRaya(silencioso=True, usar_libro=False)
+        unico.tablero[:] = tablero
+        unico.sincronizar()
+        motor_paralelo.tablero[:] = tablero
+        motor_paralelo.sincronizar()
+        esperado = unico.buscar_raiz(nuevo_contador())
+        obtenido = motor_paralelo.buscar_raiz_paralela(nuevo_contador())
+        assert obtenido[:2] == esperado[:2], "".join(tablero)
+        assert motor_paralelo.obtener_mejor_movimiento() == unico.obtener_mejor_movimiento()
+
+
+def test_telemetria_paralela_sin_tabla_del_motor(motor_paralelo, capsys):
+    # La tabla del motor no se usa con varios procesos: no se informa como si estuviera vacía
+    motor_paralelo.tablero[:] = list("    O    ")
+    motor_paralelo.telemetria = True
+    motor_paralelo.silencioso = False
+    try:
+        motor_paralelo.obtener_mejor_movimiento()
+    finally:
+        motor_paralelo.telemetria = False
+        motor_paralelo.silencioso = True
+    registro = motor_paralelo.ultima_telemetria
+    assert registro["procesos"] == 2 and registro["tt_guardados"] > 0
+    assert "tt_entradas" not in registro and "tt_desalojos" not in registro
+    assert "TT entradas" not in capsys.readouterr().out
+
+
+def capturar(ruta, tablero):
+    # Árbol de una búsqueda con fichas propias (A para la IA, B para el humano)
+    captura = CapturaArbol(str(ruta))
+    motor = TresEnRaya(silencioso=True, usar_libro=False, jugador_ia="A", jugador_humano="B", captura_arbol=captura)
+    motor.tablero[:] = tablero
+    motor.obtener_mejor_movimiento()
+    captura.cerrar()
+
+
+def test_arbol_binario_igual_que_jsonl(tmp_path):
+    tablero = ["B", " ", " ", " ", "A", " ", " ", " ", "B"]
+    capturar(tmp_path / "arbol.jsonl", tablero)
+    capturar(tmp_path / "arbol.bin", tablero)
+    esperado = [json.loads(linea) for linea in (tmp_path / "arbol.jsonl").read_text(encoding="utf-8").splitlines()]
+    esperado.sort(key=lambda nodo: nodo["id"])
+
+    ruta = str(tmp_path / "arbol.bin")
+    raices = leer_raices(ruta, jugadores=("A", "B"))
+    assert len(raices) == 1 and raices[0]["tamano"] == len(esperado)
+    # Todo el subárbol de la raíz, registro a registro, es lo que se escribió en JSON
+    assert leer_subarbol(ruta, 0, niveles=len(tablero), jugadores=("A", "B")) == esperado
+    # Con un nivel solo se leen la raíz y sus hijos, que son las jugadas de la IA
+    hijos = leer_subarbol(ruta, 0, niveles=1, jugadores=("A", "B"))[1:]
+    assert [nodo["profundidad"] for nodo in hijos] == [1] * len(hijos)
+    assert sorted(nodo["movimiento"] for nodo in hijos) == [1, 2, 3, 5, 6, 7]
+    assert {nodo["jugador"] for nodo in hijos} == {"A"}
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+# Tipos de entrada de la tabla
+EXACTO = 0
+COTA_INFERIOR = 1
+COTA_SUPERIOR = 2
+
+
+def valor_a_tabla(valor, profundidad, umbral=0):
+    # Se guarda la distancia a la victoria/derrota desde el propio nodo,
+    # así la entrada sirve aunque la posición aparezca a otra profundidad en un turno posterior.
+    # Los valores heurísticos del horizonte (|valor| <= umbral) no dependen de la profundidad.
+    if valor > umbral:
+        return valor + profundidad
+    if valor < -umbral:
+        return valor - profundidad
+    return valor
+
+
+def valor_desde_tabla(valor, profundidad, umbral=0):
+    if valor > umbral:
+        return valor - profundidad
+    if valor < -umbral:
+        return valor + profundidad
+    return valor
+
+
+class TablaTransposicion:
+    def __init__(self, capacidad=100000, politica="lru"):
+        if capacidad <= 0:
+            raise ValueError("La capacidad de la tabla debe ser positiva")
+        if politica not in ("lru", "fifo"):
+            raise ValueError(f"Política de reemplazo desconocida: {politica}")
+        self.capacidad = capacidad
+        self.politica = politica
+        self.entradas = OrderedDict()  # clave -> (valor, tipo, mejor_movimiento_canonico, profundidad_restante)
+        self.desalojos = 0
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def buscar(self, clave):
+        entrada = self.entradas.get(clave)
+        if entrada is not None and self.politica == "lru":
+            self.entradas.move_to_end(clave)
+        return entrada
+
+    def guardar(self, clave, entrada):
+        if clave in self.entradas:
+            self.entradas[clave] = entrada
+            if self.politica == "lru":
+                self.entradas.move_to_end(clave)
+            return
+        if len(self.entradas) >= self.capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojos += 1
+        self.entradas[clave] = entrada
+
+    def limpiar(self):
+        self.entradas.clear()
+        self.desalojos = 0
@@ -1,14 +1,18 @@
-import matplotlib.pyplot as plt
-import networkx as nx
 import random
-from copy import deepcopy
+from libro_tresenraya import cargar_libro
+from tablero_bits import MotorBits
 
 class TresEnRaya:
-    def __init__(self):
+    def __init__(self, usar_libro=True, silencioso=False):
+        # El minimax sin poda solo es viable en el 3x3
+        self.filas, self.columnas, self.k = 3, 3, 3
         self.tablero = [" " for _ in range(9)]
         self.jugador_humano = "O"
         self.jugador_ia = "X"
         self.historial_jugadas = []  # [(jugador, pos, f(v), alternativas)]
+        self.silencioso = silencioso
+        # Libro generado con `python libro_tresenraya.py`; si no existe se busca siempre
+        self.libro = cargar_libro() if usar_libro else None
 
     def imprimir_tablero(self):
         for i in range(0, 9, 3):
@@ -22,10 +26,11 @@ class TresEnRaya:
     def realizar_movimiento(self, posicion, jugador):
         if self.tablero[posicion] == " ":
             self.tablero[posicion] = jugador
-            print(f"\n{jugador} juega en la posición {posicion}")
-            self.imprimir_tablero()
-            f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
-            print(f"Heurística actual: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+            if not self.silencioso:
+                print(f"\n{jugador} juega en la posición {posicion}")
+                self.imprimir_tablero()
+                f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+                print(f"Heurística actual: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
             return True
         return False
 
@@ -92,7 +97,27 @@ class TresEnRaya:
                 mejor_puntaje = min(mejor_puntaje, puntaje)
             return mejor_puntaje
 
+    def movimiento_de_libro(self):
+        consulta = self.libro.consultar(self.tablero, self.jugador_ia)
+        if consulta is None:
+            return None
+        valor, movimiento = consulta
+        self.tablero[movimiento] = self.jugador_ia
+        f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
+        self.tablero[movimiento] = " "
+        self.historial_jugadas.append(("IA", movimiento, f"f(v)={f_valor}", []))
+
+        if not self.silencioso:
+            print(f"\n[IA consulta el libro: valor minimax {valor}]")
+            print(f"IA elige la posición {movimiento} con score heurístico: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+        return movimiento
+
     def obtener_mejor_movimiento(self):
+        if self.libro is not None:
+            movimiento = self.movimiento_de_libro()
+            if movimiento is not None:
+                return movimiento
+
         mejor_puntaje = float("-inf")
         mejor_movimiento = None
         mejor_f_valor = None
@@ -103,7 +128,8 @@ class TresEnRaya:
         for movimiento in self.movimientos_disponibles():
             self.tablero[movimiento] = self.jugador_ia
             f_valor, lineas_ia, lineas_humano = self.evaluar_heuristica()
-            print(f"Evaluando jugada IA en posición {movimiento}: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
+            if not self.silencioso:
+                print(f"Evaluando jugada IA en posición {movimiento}: f(v) = {lineas_ia} - {lineas_humano} = {f_valor}")
             puntaje = self.minimax(0, False)
             self.tablero[movimiento] = " "
             if puntaje > mejor_puntaje:
@@ -120,7 +146,8 @@ class TresEnRaya:
         alt_textos = [f"Pos {mov}: f(v)={v}" for mov, v in alternativas]
         self.historial_jugadas.append(("IA", mejor_movimiento, f"f(v)={mejor_f_valor}", alt_textos))
 
-        print(f"IA elige la posición {mejor_movimiento} con score heurístico: f(v) = {mejor_lineas_ia} - {mejor_lineas_humano} = {mejor_f_valor}")
+        if not self.silencioso:
+            print(f"IA elige la posición {mejor_movimiento} con score heurístico: f(v) = {mejor_lineas_ia} - {mejor_lineas_humano} = {mejor_f_valor}")
         return mejor_movimiento
 
     def jugar(self):
@@ -171,6 +198,10 @@ class TresEnRaya:
         self.graficar_arbol()
 
     def graficar_arbol(self):
+        # matplotlib y networkx solo hacen falta para dibujar: se importan aquí
+        import matplotlib.pyplot as plt
+        import networkx as nx
+
         G = nx.DiGraph()
         pos = {}
         labels = {}
@@ -215,6 +246,30 @@ class TresEnRaya:
         plt.show()
 
 
+class TresEnRayaBits(MotorBits, TresEnRaya):
+    # Misma API que TresEnRaya, con el tablero representado como bitboards
+    def minimax(self, profundidad, es_maximizando):
+        # Mismo recorrido y valores que TresEnRaya.minimax, pero sobre los dos enteros: sin pasar
+        # por TableroBits ni crear listas, que es lo que cuesta en cada nodo
+        bits = self.tablero.bits
+        geometria = self.geometria_bits
+        if geometria.gana(bits[0]):
+            return 10 - profundidad
+        if geometria.gana(bits[1]):
+            return profundidad - 10
+        libres = geometria.todas & ~(bits[0] | bits[1])
+        if not libres:
+            return 0
+
+        # bits[0] son las fichas de la IA (la que maximiza) y bits[1] las del humano
+        indice = 0 if es_maximizando else 1
+        puntajes = []
+        for movimiento in geometria.posiciones(libres):
+            bits[indice] |= 1 << movimiento
+            puntajes.append(self.minimax(profundidad + 1, not es_maximizando))
+            bits[indice] ^= 1 << movimiento
+        return max(puntajes) if es_maximizando else min(puntajes)
+
 
 # Iniciar el juego
 if __name__ == "__main__":